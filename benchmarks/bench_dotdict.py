@@ -0,0 +1,91 @@
+"""Dotdict micro-benchmark against the previous (copy-on-access) implementation.
+
+usage: python -m benchmarks.bench_dotdict [rows]
+"""
+import copy
+import sys
+import timeit
+
+from src.utils import Dotdict
+
+
+class LegacyDotdict(dict):
+    # implementation before the view based Dotdict, kept here for comparison only
+    def __getattr__(self, key):
+        return self[key]
+
+    def __setattr__(self, key, value):
+        self[key] = value
+
+    def __getitem__(self, key):
+        res = super().__getitem__(key)
+        if isinstance(res, dict):
+            self[key] = LegacyDotdict(res)
+        elif isinstance(res, list):
+            for i in range(len(res)):
+                if isinstance(res[i], dict):
+                    res[i] = LegacyDotdict(res[i])
+        return super().__getitem__(key)
+
+    def __missing__(self, key):
+        return rf"[~~missing-key-{key}~~]"
+
+
+def order_history(rows):
+    return {
+        "code": "200",
+        "result": {
+            "total": rows,
+            "content": [
+                {
+                    "orderId": 10_000_000 + i, "symbol": f"SYM{i % 50}.std", "type": "BUY" if i % 2 else "SELL",
+                    "volume": 0.01 * (i % 10 + 1), "openPrice": 1.1 + i / 1e5, "closePrice": 1.2 + i / 1e5,
+                    "profit": {"amount": i % 97 - 48, "currency": "USD"}, "createTime": 1700000000000 + i,
+                }
+                for i in range(rows)
+            ],
+        },
+    }
+
+
+def scenarios(cls, payload):
+    def first_row():
+        # typical test access: wrap the body then read a few fields
+        d = cls(payload)
+        return d.result.content[0].symbol, d.result.total
+
+    def scan_rows():
+        d = cls(payload)
+        rows = d.result.content
+        return sum(rows[i].profit.amount for i in range(0, len(rows), 100))
+
+    def repeated_reads():
+        d = cls(payload)
+        for _ in range(100):
+            d.result.content[0].profit.currency
+        return d
+
+    return dict(first_row=first_row, scan_rows=scan_rows, repeated_reads=repeated_reads)
+
+
+def main(rows=10_000, number=20):
+    payload = order_history(rows)
+    print(f"payload: {rows} rows, {number} runs per scenario")
+    print(f"{'scenario':<16}{'legacy (ms)':>14}{'dotdict (ms)':>14}{'speedup':>10}")
+
+    for name in scenarios(Dotdict, payload):
+        results = []
+        for cls in (LegacyDotdict, Dotdict):
+            data = copy.deepcopy(payload)  # legacy rewrites its input, don't let it warm up the next run
+            func = scenarios(cls, data)[name]
+            results.append(min(timeit.repeat(func, number=number, repeat=3)) / number * 1000)
+        legacy, current = results
+        print(f"{name:<16}{legacy:>14.3f}{current:>14.3f}{legacy / current:>9.1f}x")
+
+    data = copy.deepcopy(payload)
+    scenarios(Dotdict, data)["scan_rows"]()
+    print(f"underlying json untouched: {data == payload and type(data['result']) is dict}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000)
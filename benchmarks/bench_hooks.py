@@ -0,0 +1,221 @@
+"""Per-request and per-assertion overhead of the framework hook stack.
+
+Each layer is timed in isolation around a canned transport returning a prepared response (no network), then the
+whole stack is timed end to end against the in-process stand-in server. Results are appended to a jsonl file
+keyed by commit so regressions show up across commits.
+
+usage: python -m benchmarks.bench_hooks [--sizes 1024,10240,...] [--output PATH] [--no-save]
+"""
+import argparse
+import datetime
+import json
+import logging
+import platform
+import subprocess
+import time
+import tracemalloc
+from pathlib import Path
+
+import requests
+
+from src import consts
+from src.core import hooks
+from src.core.request import XRequest
+from src.core.response import XResponse
+from src.data_runtime import DataRuntime
+from src.utils import Dotdict
+from src.utils.allure_utils import (
+    format_request_response, render_request_response_html, render_request_response_text, request_response_content,
+    content_file_name,
+)
+from src.utils.logger_utils import logger
+from src.utils.stub_server import StubServer
+
+DEFAULT_SIZES = [1024, 10 * 1024, 100 * 1024, 1024 ** 2, 10 * 1024 ** 2]
+DEFAULT_OUTPUT = consts.PROJECT_ROOT / "benchmarks" / "results" / "hooks.jsonl"
+PENDING_URL = "/api/order/v1/pending"
+
+
+def canned_response(size, base_url="http://bench.local"):
+    row = dict(orderId=0, symbol="EURUSD.std", type="BUY_LIMIT", volume=0.01, price=1.0, createTime=0)
+    rows = [row | dict(orderId=i) for i in range(max(size // (len(json.dumps(row)) + 2), 1))]
+
+    resp = requests.Response()
+    resp.status_code = 200
+    resp.headers["Content-Type"] = "application/json"
+    resp._content = json.dumps(dict(code="200", result=rows)).encode()
+    resp.encoding = "utf8"
+    resp.elapsed = datetime.timedelta(milliseconds=5)
+    resp.request = requests.Request(
+        "GET", f"{base_url}{PENDING_URL}", params=dict(symbol="EURUSD.std"), headers=dict(authorization="Bearer x")
+    ).prepare()
+    return resp
+
+
+def measure(func, budget=0.2):
+    """Mean seconds per call and peak bytes allocated by one call."""
+    start = time.perf_counter()
+    func()
+    once = time.perf_counter() - start
+    number = max(1, min(5000, int(budget / max(once, 1e-7))))
+
+    start = time.perf_counter()
+    for _ in range(number):
+        func()
+    mean = (time.perf_counter() - start) / number
+
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    baseline, _ = tracemalloc.get_traced_memory()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return mean, max(peak - baseline, 0)
+
+
+def request_layers(size):
+    resp = canned_response(size)
+
+    def transport(*args, **kwargs):
+        return resp
+
+    avoid_timeout = hooks.avoid_timeout(transport)
+    patch_request = hooks.patch_request(transport)
+    xresponse = XResponse(resp)
+
+    def xrequest():
+        # XRequest + __catcherror__ + XResponse wrap + Session.get, transport replaced by the canned response
+        original = requests.Session.request
+        requests.Session.request = transport
+        try:
+            XRequest(dict(authorization="Bearer x")).get(PENDING_URL, dict(symbol="EURUSD.std"))
+        finally:
+            requests.Session.request = original
+
+    return {
+        "avoid_timeout": lambda: avoid_timeout(None, "GET", resp.request.url),
+        "patch_request": lambda: patch_request(None, "GET", resp.request.url, attach=False),
+        "patch_request+attach": lambda: patch_request(None, "GET", resp.request.url),
+        "xrequest": xrequest,
+        "curl": xresponse.cash_request_to_curl,
+        "attachment_text": lambda: format_request_response(XResponse(resp)),
+        "attachment_html": lambda: render_request_response_html(*request_response_content(XResponse(resp))),
+        "attachment_digest": lambda: content_file_name(
+            "x-attachment.txt", render_request_response_text(*request_response_content(XResponse(resp))).encode("utf8")
+        ),
+        "json_parse": lambda: XResponse(resp).json(),
+    }
+
+
+def assertion_layers(size):
+    resp = canned_response(size)
+    info = logger.info
+    warning = logger.warning
+    patched_info = hooks.patch_log_info(info)
+
+    def with_logger(check, patched):
+        def run():
+            logger.info = patched_info if patched else info
+            try:
+                check(XResponse(resp))
+            finally:
+                logger.info = info
+                logger.warning = warning
+                del hooks.loggingmsgs[:]
+        return run
+
+    status = lambda x: x.check_status_code(200)  # noqa
+    payload = lambda x: x.check_payload_equals("EURUSD.std", key="result[0].symbol")  # noqa
+    batch = lambda x: x.check_payload({"code": "200", "result[*].symbol": ("end with", ".std")})  # noqa
+
+    return {
+        "check_status_code": with_logger(status, False),
+        "check_status_code+patch_logger": with_logger(status, True),
+        "check_payload_equals": with_logger(payload, False),
+        "check_payload_equals+patch_logger": with_logger(payload, True),
+        "check_payload[*]+patch_logger": with_logger(batch, True),
+    }
+
+
+def end_to_end_layers(server, size):
+    server.payload_size = size
+    session = requests.Session()
+    url = f"{server.url}{PENDING_URL}"
+    headers = dict(authorization="Bearer x")
+    client = XRequest(headers)
+
+    def raw():
+        session.get(url, params=dict(symbol="EURUSD.std"), headers=headers).content  # noqa
+
+    def full_stack():
+        original = requests.Session.request
+        requests.Session.request = hooks.avoid_timeout(hooks.patch_request(original))
+        try:
+            client.get(PENDING_URL, dict(symbol="EURUSD.std")).check_status_code(200)
+        finally:
+            requests.Session.request = original
+
+    return {"e2e_raw_session": raw, "e2e_full_stack": full_stack}
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=consts.PROJECT_ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def previous_results(output):
+    try:
+        with open(output, "r", encoding="utf8") as _f:
+            lines = [line for line in _f if line.strip()]
+    except FileNotFoundError:
+        return {}
+    if not lines:
+        return {}
+    return {(row["layer"], row["payload_bytes"]): row for row in json.loads(lines[-1])["results"]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)), help="Comma separated payload sizes in bytes")
+    parser.add_argument("--output", default=str(DEFAULT_OUTPUT), help="jsonl file results are appended to")
+    parser.add_argument("--no-save", action="store_true", help="Print only, don't append results")
+    args = parser.parse_args()
+
+    # keep log emission out of the measurements, formatting cost stays in
+    logger.handlers[:] = [logging.NullHandler()]
+    logger.setLevel(logging.INFO)
+
+    previous = previous_results(args.output)
+    results = []
+    print(f"{'layer':<36}{'payload':>10}{'mean (us)':>14}{'alloc (KB)':>12}{'vs last':>9}")
+
+    with StubServer() as server:
+        DataRuntime.config = Dotdict(url=server.url)
+        for size in map(int, args.sizes.split(",")):
+            layers = request_layers(size) | assertion_layers(size) | end_to_end_layers(server, size)
+            for layer, func in layers.items():
+                mean, alloc = measure(func)
+                row = dict(layer=layer, payload_bytes=size, mean_us=round(mean * 1e6, 2), alloc_peak_bytes=alloc)
+                results.append(row)
+
+                last = previous.get((layer, size))
+                ratio = f"{row['mean_us'] / last['mean_us']:.2f}x" if last and last["mean_us"] else "-"
+                print(f"{layer:<36}{size:>10}{row['mean_us']:>14.1f}{alloc / 1024:>12.1f}{ratio:>9}")
+
+    if not args.no_save:
+        record = dict(
+            commit=git_commit(),
+            timestamp=datetime.datetime.now().isoformat(timespec="seconds"),
+            python=platform.python_version(),
+            results=results,
+        )
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.output, "a", encoding="utf8") as _f:
+            _f.write(json.dumps(record) + "\n")
+        print(f"results appended to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,40 +1,187 @@
+import asyncio
 import base64
 import binascii
-import functools
 import logging
-import time
+import os
+import re
+import shutil
+from collections import defaultdict
 from contextlib import suppress
+from pathlib import Path
 
 import allure
 import pytest
 import requests
 import yaml
+from allure_commons import plugin_manager
 
 from src import consts
-from src.core.response import XResponse
+from src.core import hooks
+from src.core.async_request import shutdown_executor
+from src.core.hooks import loggingmsgs as _loggingmsgs
+from src.core.retry import retry_policy, circuit_breaker, retry_stats
+from src.core.session import configure_session, close_session, pool_stats
 from src.data_runtime import DataRuntime
+from src.routes.auth.company_login import CompanyLogin
 from src.utils import Dotdict
-from src.utils.allure_utils import custom_log_info, custom_log_warning, delete_container_files, custom_allure_result, attach_request_response, \
-    format_request_response
-from src.utils.datetime_utils import pretty_time, get_current_time
+from src.utils.account_pool import AccountPool, accounts_from_config
+from src.utils.allure_utils import delete_container_files, custom_allure_result, attachment_writer, attachment_stats, ResultProcessor, result_files
+from src.utils.bulk_utils import bulk_stats
+from src.utils.cassette_utils import cassette
+from src.utils.datetime_utils import pretty_time
+from src.utils.histogram_utils import LatencyHistogram, latency_recorder
+from src.utils.load_utils import load_stats, run_virtual_users
+from src.utils.matrix_utils import MATRIX_ENV, build_matrix, run_matrix
+from src.utils.order_tracer import lifecycle_stats
+from src.utils.perf_baseline import PerfBaseline, REGRESSION
+from src.utils.schedule_utils import DurationDB, module_of, lpt_tree_order, lpt_assign
 from src.utils.logger_utils import setup_logging, logger
+from src.utils.stub_server import StubServer
+from src.utils.token_cache import token_cache
+from src.utils.traffic_log import traffic_log
 
-_loggingmsgs = []
+_stub_server: StubServer | None = None
+_account_pool: AccountPool | None = None
+_perf_report: list | None = None
+_duration_db: DurationDB | None = None
+_result_processor: ResultProcessor | None = None
+
+# suffix xdist --dist loadgroup appends to node ids
+_XDIST_GROUP = re.compile(r"@[\w-]+$")
 
 
 def pytest_addoption(parser):
     general = parser.getgroup("General")
     general.addoption("--debuglog", action="store_true", default=False)
     parser.addoption("--env", default="sit", help="Environment to run tests (sit, release_sit, uat)")
-    parser.addoption("--client", default="lirunex", help="Client to run test (lirunex, transactCloud) - single value only")
-    parser.addoption("--account", default="demo", choices=["live", "demo", "crm"], help="Account type to run test (lirunex: crm/ demo, transactCloud: live/ demo)")
-    parser.addoption("--server", default="mt5", choices=["mt4", "mt5"], help="Server to run test on")
+    parser.addoption("--client", default="lirunex", help="Client to run test (lirunex, transactCloud) - comma separated with --matrix")
+    parser.addoption("--account", default="demo", help="Account type to run test (lirunex: crm/ demo, transactCloud: live/ demo) - comma separated with --matrix")
+    parser.addoption("--server", default="mt5", help="Server to run test on (mt4, mt5) - comma separated with --matrix")
     parser.addoption("--user", help="Custom user used to run test")
     parser.addoption("--password", help="Raw custom password")
     parser.addoption("--url", help="Custom url for running external tenant")
+    parser.addoption("--no-token-cache", action="store_true", default=False, help="Log in again instead of reusing cached tokens")
+    parser.addoption("--allow-orders", action="store_true", default=False, help="Run tests marked places_orders against a real server (always run with --stub)")
+
+    accounts = parser.getgroup("Accounts")
+    accounts.addoption("--no-lease", action="store_true", default=False, help="Share the first configured account instead of leasing one")
+    accounts.addoption("--lease-wait", type=float, default=300, help="Seconds to wait for a free account")
+    accounts.addoption("--lease-timeout", type=float, default=1800, help="Seconds after which a lease not renewed is considered stale")
+
+    connection = parser.getgroup("Connection")
+    connection.addoption("--pool-size", type=int, default=10, help="Max keep-alive connections per host")
+    connection.addoption("--pool-hosts", type=int, default=4, help="Number of host pools kept alive")
+    connection.addoption("--no-keepalive", action="store_true", default=False, help="Close connection after each request")
+
+    retry = parser.getgroup("Retry")
+    retry.addoption("--retries", type=int, default=3, help="Retries of a request failing on connection errors or timeouts")
+    retry.addoption("--retry-backoff", type=float, default=0.5, help="Base seconds of the exponential backoff between retries")
+    retry.addoption("--retry-max-backoff", type=float, default=8, help="Upper bound of a single backoff wait")
+    retry.addoption("--retry-budget", type=float, default=60, help="Seconds a request may spend across all attempts")
+    retry.addoption("--request-timeout", type=float, default=30, help="Timeout of a single attempt, unless given by the caller")
+    retry.addoption("--breaker-threshold", type=int, default=5, help="Consecutive failures before a host fails fast")
+    retry.addoption("--breaker-cooldown", type=float, default=30, help="Seconds a host fails fast before a probe request")
+
+    perf = parser.getgroup("Performance baseline")
+    perf.addoption("--perf-baseline", choices=["compare", "update"], help="Compare endpoint latencies to the stored baseline, or store this session as the baseline")
+    perf.addoption("--perf-baseline-file", default=str(consts.PERF_BASELINE_FILE), help="Baseline json file")
+    perf.addoption("--perf-tolerance", type=float, default=0.2, help="Relative slowdown of the median tolerated before counting a request as slower")
+    perf.addoption("--perf-alpha", type=float, default=0.01, help="Significance level of the sign test flagging a regression")
+    perf.addoption("--perf-min-samples", type=int, default=10, help="Requests an endpoint needs to be compared or stored")
+
+    scheduling = parser.getgroup("Scheduling")
+    scheduling.addoption("--no-reorder", action="store_true", default=False, help="Keep collection order instead of running the longest tests first")
+    scheduling.addoption("--schedule-unit", default="module", choices=["module", "test"], help="Reorder whole modules or single tests within their module, packages always run as one block")
+
+    matrix = parser.getgroup("Matrix")
+    matrix.addoption("--matrix", action="store_true", default=False, help="Run every --client x --server x --account combination in parallel")
+    matrix.addoption("--matrix-workers", type=int, default=0, help="Combinations run at the same time (default: all)")
+
+    cassettes = parser.getgroup("Cassette")
+    cassettes.addoption("--record", metavar="PATH", help="Record every request/response into a jsonl cassette")
+    cassettes.addoption("--replay", metavar="PATH", help="Serve requests from a recorded cassette instead of the network")
+    cassettes.addoption("--replay-strict", action="store_true", default=False, help="Fail requests missing from the cassette")
+    cassettes.addoption("--scrub-headers", default=",".join(consts.SCRUB_HEADERS), help="Comma separated headers masked in cassettes")
+    cassettes.addoption("--scrub-fields", default=",".join(consts.SCRUB_FIELDS), help="Comma separated json fields masked in cassettes")
+
+    traffic = parser.getgroup("Traffic log")
+    traffic.addoption("--traffic-log", metavar="PATH", help="Append one compact jsonl record per response to PATH")
+    traffic.addoption("--traffic-log-max-mb", type=float, default=100, help="Rotate the traffic log past this size")
+    traffic.addoption("--traffic-log-backups", type=int, default=5, help="Rotated traffic log files kept")
+    traffic.addoption("--traffic-log-gzip", action="store_true", default=False, help="Gzip rotated traffic log files")
+    traffic.addoption("--traffic-log-bodies", type=int, default=0, metavar="CHARS", help="Keep request/response bodies truncated to CHARS")
+
+    report = parser.getgroup("Allure report")
+    report.addoption("--allure-workers", type=int, default=1, help="Processes rewriting unprocessed allure results at the end of the run")
+    report.addoption("--attachment-limit", type=int, default=64 * 1024, metavar="CHARS", help="Truncate response bodies in request attachments past CHARS (0 keeps them whole)")
+
+    stub = parser.getgroup("Stub")
+    stub.addoption("--stub", action="store_true", default=False, help="Run against an in-process stand-in server instead of --url")
+    stub.addoption("--stub-latency", type=float, default=0, help="Seconds the stand-in server waits before answering")
+    stub.addoption("--stub-jitter", type=float, default=0, help="Random +/- seconds added to --stub-latency")
+    stub.addoption("--stub-payload-size", type=int, default=0, help="Pad list payloads of the stand-in server to this many bytes")
+    stub.addoption("--stub-propagation", type=float, default=0, help="Seconds before a placed order shows up in the order endpoints")
+    stub.addoption("--stub-history", type=int, default=0, help="Generated past deals served by the deal histories endpoint")
+
+    load = parser.getgroup("Load")
+    load.addoption("--load", action="store_true", default=False, help="Replay selected tests as concurrent virtual users")
+    load.addoption("--load-users", type=int, default=10, help="Number of virtual users")
+    load.addoption("--load-ramp-up", type=float, default=0, help="Seconds to start all virtual users")
+    load.addoption("--load-duration", type=float, default=60, help="Seconds each test is replayed after ramp-up")
+    load.addoption("--load-think-time", type=float, default=0, help="Seconds a virtual user waits between iterations")
+
+
+def load_env_config(env):
+    with open(consts.ENV_DIR / f"{env}.yaml", "r") as _env:
+        return Dotdict(yaml.load(_env, Loader=yaml.FullLoader))
+
+
+def pytest_configure(config):
+    if config.option.matrix:
+        return
+
+    for name, choices in (("account", ["live", "demo", "crm"]), ("server", ["mt4", "mt5"])):
+        if "," in config.getoption(name):
+            raise pytest.UsageError(f"--{name} takes a single value, use --matrix to run several")
+        if config.getoption(name) not in choices:
+            raise pytest.UsageError(f"--{name}: invalid choice {config.getoption(name)!r} (choose from {', '.join(choices)})")
+    if "," in config.getoption("client"):
+        raise pytest.UsageError("--client takes a single value, use --matrix to run several")
+
+
+def pytest_cmdline_main(config):
+    if not config.option.matrix or os.environ.get(MATRIX_ENV) or config.option.collectonly:
+        return None
+
+    combinations, skipped = build_matrix(
+        config.option.client, config.option.server, config.option.account, load_env_config(config.option.env)
+    )
+    for combination in skipped:
+        print(f"Matrix: skip {combination.name}, no credentials configured")
+    if not combinations:
+        raise pytest.UsageError("--matrix: no combination has configured credentials")
+
+    allure_dir = config.option.allure_report_dir
+    if allure_dir and config.option.clean_alluredir:  # once here, the combinations would wipe each other's results
+        shutil.rmtree(allure_dir, ignore_errors=True)
+    existing = result_files(allure_dir) if allure_dir else set()
+    results = run_matrix(list(config.invocation_params.args), combinations, config.option.matrix_workers)
+
+    print("\x00")
+    for result in results:
+        icon = consts.PASSED_ICON if result.returncode == 0 else consts.FAILED_ICON
+        print(f"{icon} {result.combination.name} | exit code: {result.returncode} | duration: {pretty_time(result.duration)}")
+
+    # combinations share the allure dir, post-process it once, their own results were processed as reported
+    if allure_dir:
+        delete_container_files(allure_dir)
+        custom_allure_result(allure_dir, config.option.allure_workers, processed=result_files(allure_dir) - existing, matrix=True)
+
+    return max(result.returncode for result in results)
 
 
 def pytest_sessionstart(session):
+    global _stub_server, _result_processor
     setup_logging(logging.INFO)
 
     logger.info("=== Start Pytest session ===")
@@ -51,9 +198,20 @@ def pytest_sessionstart(session):
     password = runtime_option["password"]
     url = runtime_option["url"]
 
+    if runtime_option["stub"]:  # point every client to the local stand-in server
+        _stub_server = StubServer(
+            client=client,
+            account=account_type,
+            latency=runtime_option["stub_latency"],
+            jitter=runtime_option["stub_jitter"],
+            payload_size=runtime_option["stub_payload_size"],
+            propagation=runtime_option["stub_propagation"],
+            history=runtime_option["stub_history"],
+        ).start()
+        url = _stub_server.url
+
     # load env config file
-    with open(consts.ENV_DIR / f"{runtime_option['env']}.yaml", "r") as _env:
-        DataRuntime.config = Dotdict(yaml.load(_env, Loader=yaml.FullLoader))
+    DataRuntime.config = load_env_config(runtime_option["env"])
 
     # load runtime option
     DataRuntime.option = Dotdict(runtime_option)
@@ -63,18 +221,127 @@ def pytest_sessionstart(session):
         DataRuntime.config[f"password_{account_type}"] = base64.b64decode(DataRuntime.config[f"password_{account_type}"]).decode()
 
     # assign config with runtime options
-    DataRuntime.config.user = user or DataRuntime.config[client].credentials[server][f"user_{account_type}"]
-    DataRuntime.config.password = password or DataRuntime.config[f"password_{account_type}"]
     DataRuntime.config.url = url or DataRuntime.config[client].url
+    if user:
+        DataRuntime.config.user = user
+        DataRuntime.config.password = password or DataRuntime.config[f"password_{account_type}"]
+    else:
+        account = lease_account(session.config, DataRuntime.config[client].credentials[server][f"user_{account_type}"])
+        DataRuntime.config.user = account.user
+        DataRuntime.config.password = password or account.password
+
+    token_cache.enabled = not runtime_option["no_token_cache"]
+
+    if cassette_path := runtime_option["record"] or runtime_option["replay"]:
+        cassette.open(
+            cassette_path,
+            "record" if runtime_option["record"] else "replay",
+            strict=runtime_option["replay_strict"],
+            scrub_headers=filter(None, runtime_option["scrub_headers"].split(",")),
+            scrub_fields=filter(None, runtime_option["scrub_fields"].split(",")),
+        )
+
+    if runtime_option["traffic_log"]:
+        traffic_log.open(
+            runtime_option["traffic_log"],
+            max_bytes=int(runtime_option["traffic_log_max_mb"] * 1024 ** 2),
+            backups=runtime_option["traffic_log_backups"],
+            compress=runtime_option["traffic_log_gzip"],
+            body_limit=runtime_option["traffic_log_bodies"],
+        )
+
+    retry_policy.retries = runtime_option["retries"]
+    retry_policy.backoff = runtime_option["retry_backoff"]
+    retry_policy.max_backoff = runtime_option["retry_max_backoff"]
+    retry_policy.budget = runtime_option["retry_budget"]
+    retry_policy.timeout = runtime_option["request_timeout"]
+    circuit_breaker.threshold = runtime_option["breaker_threshold"]
+    circuit_breaker.cooldown = runtime_option["breaker_cooldown"]
+
+    # shared connection pool for all route clients
+    configure_session(
+        pool_connections=runtime_option["pool_hosts"],
+        pool_maxsize=max(runtime_option["pool_size"], runtime_option["load_users"] if runtime_option["load"] else 0),
+        keep_alive=not runtime_option["no_keepalive"]
+    )
+
+    attachment_writer.body_limit = runtime_option["attachment_limit"]
+
+    # process allure results as they are reported instead of all at the end of the session
+    if allure_dir := runtime_option["allure_report_dir"]:
+        _result_processor = ResultProcessor(allure_dir)
+        plugin_manager.register(_result_processor)
 
     if runtime_option["debuglog"]:  # switch log level to debug
         setup_logging(logging.DEBUG)
 
 
+def is_xdist_controller(config):
+    return getattr(config.option, "dist", "no") != "no" and not hasattr(config, "workerinput")
+
+
+def lease_account(config, entry):
+    """Exclusive account of this worker out of the configured ones, a single configured account is shared."""
+    global _account_pool
+    option = DataRuntime.option
+    accounts = accounts_from_config(entry, DataRuntime.config[f"password_{option.account}"])
+
+    # xdist controller runs no test, it doesn't need an account
+    if len(accounts) == 1 or option.no_lease or is_xdist_controller(config):
+        return accounts[0]
+
+    _account_pool = AccountPool(
+        accounts,
+        namespace="|".join([DataRuntime.config.url, option.client, option.server, option.account]),
+        lease_timeout=option.lease_timeout,
+        wait=option.lease_wait,
+    )
+    account = _account_pool.acquire(owner=os.environ.get("PYTEST_XDIST_WORKER", "main"))
+    logger.info(f"Running as account {account.user}")
+    return account
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_collection_modifyitems(session, config, items):
+    global _duration_db
+    _duration_db = DurationDB()
+
+    # order placing endpoints are only verified against the stand-in server
+    if not config.option.stub and not config.option.allow_orders:
+        skip_orders = pytest.mark.skip(reason="places orders: run with --stub, or --allow-orders against a real server")
+        for item in items:
+            if item.get_closest_marker("places_orders"):
+                item.add_marker(skip_orders)
+
+    if config.option.no_reorder or config.option.load:
+        return
+
+    # longest processing time first, package by package; new tests are estimated from their module
+    estimates = _duration_db.estimate([item.nodeid for item in items])
+    unit_of = module_of if config.option.schedule_unit == "module" else str
+    costs = defaultdict(float)
+    for item in items:
+        costs[unit_of(item.nodeid)] += estimates[item.nodeid]
+    rank = {unit: index for index, unit in enumerate(lpt_tree_order(costs))}
+    items.sort(key=lambda item: rank[unit_of(item.nodeid)])  # stable, a module keeps its own order
+
+    # --dist loadgroup: balance workers by expected duration instead of test count
+    workers = getattr(config, "workerinput", {}).get("workercount")
+    if workers and getattr(config.option, "dist", "no") == "loadgroup":
+        assignment = lpt_assign(costs, workers)
+        for item in items:
+            if not item.get_closest_marker("xdist_group"):
+                item.add_marker(pytest.mark.xdist_group(f"lpt{assignment[unit_of(item.nodeid)]}"))
+
+
 @pytest.hookimpl(tryfirst=True)
 def pytest_runtest_setup(item: pytest.Item):
+    if _account_pool:
+        _account_pool.renew()
+
     allure.dynamic.parent_suite(DataRuntime.option.client.upper())
     allure.dynamic.suite(DataRuntime.option.server.upper())
+    allure.dynamic.sub_suite(DataRuntime.option.account.upper())
 
     print("\x00")
 
@@ -84,6 +351,26 @@ def pytest_runtest_call(item: pytest.Item):
     allure.dynamic.tag(f"user: {DataRuntime.config.user}")
 
 
+@pytest.hookimpl(tryfirst=True)
+def pytest_pyfunc_call(pyfuncitem: pytest.Function):
+    if not DataRuntime.option.load:
+        return None
+
+    kwargs = {arg: pyfuncitem.funcargs[arg] for arg in pyfuncitem._fixtureinfo.argnames}
+    error = run_virtual_users(
+        pyfuncitem.obj, kwargs,
+        authenticate=lambda account: CompanyLogin().authenticate(*(account or ()), use_cache=False),
+        accounts=_account_pool,
+        users=DataRuntime.option.load_users,
+        ramp_up=DataRuntime.option.load_ramp_up,
+        duration=DataRuntime.option.load_duration,
+        think_time=DataRuntime.option.load_think_time,
+    )
+    if error:
+        raise error
+    return True
+
+
 @pytest.hookimpl(tryfirst=True)
 def pytest_runtest_teardown(item: pytest.Item):
     print("\x00")
@@ -92,7 +379,6 @@ def pytest_runtest_teardown(item: pytest.Item):
 
 @pytest.hookimpl(hookwrapper=True)
 def pytest_runtest_makereport(item, call):
-    global _loggingmsgs
     report = (yield).get_result()
 
     if report.when == 'call':
@@ -100,6 +386,9 @@ def pytest_runtest_makereport(item, call):
 
 
 def pytest_runtest_logreport(report):
+    if _duration_db is not None and report.outcome != "skipped" and not DataRuntime.option.load:
+        _duration_db.record(_XDIST_GROUP.sub("", report.nodeid), report.duration)
+
     if report.when == "call":
         printlog = logger.info if report.outcome == "passed" else logger.warning
         print("\x00")  # print a non-printable character to break a new line on console
@@ -115,6 +404,53 @@ def pytest_terminal_summary(terminalreporter, exitstatus, config):
     failed = len(terminalreporter.stats.get("failed", []))
     broken = len(terminalreporter.stats.get("broken", []))
 
+    if latency_recorder.histograms:
+        terminalreporter.section("Latency")
+        terminalreporter.write_line(latency_recorder.format_summary())
+
+    if bulk_stats.endpoints:
+        terminalreporter.section("Bulk orders")
+        terminalreporter.write_line(bulk_stats.format_summary())
+
+    if lifecycle_stats.stages or lifecycle_stats.missed:
+        terminalreporter.section("Order lifecycle")
+        terminalreporter.write_line(lifecycle_stats.format_summary())
+
+    if load_stats.endpoints:
+        terminalreporter.section("Load")
+        terminalreporter.write_line(
+            f"iterations: {load_stats.iterations} | failed: {load_stats.failures} | elapsed: {pretty_time(load_stats.elapsed)}"
+        )
+        for row in load_stats.report():
+            terminalreporter.write_line(
+                f"{row['endpoint']} | requests: {row['requests']} | errors: {row['errors']} ({row['error_rate']:.2f}%) | "
+                f"throughput: {row['throughput']:.2f} req/s"
+            )
+
+    if _perf_report:
+        terminalreporter.section("Performance baseline")
+        terminalreporter.write_line(PerfBaseline.format_report(_perf_report))
+
+    if retry_stats.hosts:
+        terminalreporter.section("Retries")
+        for host, stat in retry_stats.hosts.items():
+            terminalreporter.write_line(
+                f"{host} | failures: {stat.failures} | retries: {stat.retries} | retry wait: {stat.retry_time:.2f}s | "
+                f"breaker opened: {stat.breaker_opens} | failed fast: {stat.fast_failed}"
+            )
+
+    if attachment_stats.tests:
+        attachment_writer.flush()
+        terminalreporter.section("Attachments")
+        terminalreporter.write_line(attachment_stats.format_summary())
+
+    if stats := pool_stats():
+        terminalreporter.section("Connection pool")
+        for host, stat in stats.items():
+            terminalreporter.write_line(
+                f"{host} | opened: {stat['opened']} | requests: {stat['requests']} | idle: {stat['idle']}/{stat['maxsize']}"
+            )
+
     # terminalreporter.section("Summary")
     # tw = terminalreporter._tw  # terminal writer
     # tw.line(f"Total tests: {total}")
@@ -129,90 +465,107 @@ def pytest_sessionfinish(session):
     if vars(session.config.option)["collectonly"]:
         return
 
-    allure_dir = session.config.option.allure_report_dir
-    if not allure_dir:
-        return
+    if _duration_db is not None:
+        _duration_db.save()
 
-    # Delete container files
-    delete_container_files(allure_dir)
+    # xdist worker: histograms go to the controller, which merges them in pytest_testnodedown
+    if hasattr(session.config, "workeroutput"):
+        session.config.workeroutput["latency"] = {key: histogram.to_dict() for key, histogram in latency_recorder.histograms.items()}
 
-    custom_allure_result(allure_dir)
+    # once per run: on the xdist controller with the merged histograms, never on a worker's share of them
+    if session.config.option.perf_baseline and latency_recorder.histograms and not hasattr(session.config, "workerinput"):
+        check_perf_baseline(session)
 
+    allure_dir = session.config.option.allure_report_dir
+    if not allure_dir:
+        return
 
-@pytest.fixture(scope="session", autouse=True)
-def patch_logger(request):
-    global _loggingmsgs
+    if latency_recorder.histograms:
+        allure.global_attach(latency_recorder.format_summary(), name="Latency summary", attachment_type=allure.attachment_type.TEXT)
+    if _perf_report:
+        allure.global_attach(PerfBaseline.format_report(_perf_report), name="Performance baseline", attachment_type=allure.attachment_type.TEXT)
 
-    def patch_info(f):
-        @functools.wraps(f)
-        def wrapper(*args, **kwargs):
-            __tracebackhide__ = True
+    # Write pending request attachments
+    attachment_writer.flush()
 
-            _logmsgs, *_ = args
-            _loggingmsgs.append(custom_log_info(_logmsgs))
+    if os.environ.get(MATRIX_ENV):  # post-processed by the matrix run
+        return
 
-            return f(*args, **kwargs)
+    # Delete container files
+    delete_container_files(allure_dir)
 
-        return wrapper
+    custom_allure_result(
+        allure_dir, session.config.option.allure_workers, processed=_result_processor.reported() if _result_processor else ()
+    )
 
-    def patch_warning(f):
-        @functools.wraps(f)
-        def wrapper(*args, **kwargs):
-            __tracebackhide__ = True
 
-            _logmsgs, *_ = args
-            _loggingmsgs.append(custom_log_warning(_logmsgs))
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    # xdist controller: one call per finished worker
+    if latency := getattr(node, "workeroutput", {}).get("latency"):
+        latency_recorder.merge({key: LatencyHistogram.from_dict(data) for key, data in latency.items()})
 
-            return f(*args, **kwargs)
 
-        return wrapper
+def check_perf_baseline(session):
+    global _perf_report
+    option = session.config.option
+    baseline = PerfBaseline(
+        Path(option.perf_baseline_file), tolerance=option.perf_tolerance, alpha=option.perf_alpha, min_samples=option.perf_min_samples
+    )
+    scope = dict(env=option.env, client=option.client, server=option.server)
 
-    logger.info = patch_info(logger.info)
-    logger.warning = patch_warning(logger.warning)
+    if option.perf_baseline == "update":
+        baseline.update(latency_recorder.histograms, **scope)
+        logger.info(f"Latency baseline updated: {option.perf_baseline_file}")
+        return
 
+    _perf_report = baseline.compare(latency_recorder.histograms, **scope)
+    if any(row["verdict"] == REGRESSION for row in _perf_report) and session.exitstatus == pytest.ExitCode.OK:
+        session.exitstatus = pytest.ExitCode.TESTS_FAILED
 
-@pytest.fixture(scope="session", autouse=True)
-def patch_request(request):
-    def patch(f):
-        @functools.wraps(f)
-        def wrapper(*args, **kwargs):
-            __tracebackhide__ = True
 
-            request_time = get_current_time()
-            with suppress(KeyError):
-                if not kwargs.pop("attach"):
-                    request_time = None
-            result = XResponse(f(*args, **kwargs))
-            logger.debug(format_request_response(result))
+def pytest_unconfigure(config):
+    if _stub_server:
+        _stub_server.stop()
+    cassette.close()
+    traffic_log.close()
+    if _result_processor:
+        plugin_manager.unregister(_result_processor)
+    if _account_pool:
+        _account_pool.release_all()
+    shutdown_executor()
+    close_session()
 
-            if isinstance(request_time, str):
-                attach_request_response(result, request_time=request_time)
 
-            return result
+@pytest.fixture(scope="session")
+def stub_server():
+    # running stand-in server (--stub), latency and payload size can be tuned per test
+    if _stub_server is None:
+        pytest.skip("Stand-in server is only available with --stub")
+    return _stub_server
 
-        return wrapper
 
-    requests.Session.request = patch(requests.Session.request)
+@pytest.fixture(scope="session")
+def async_loop():
+    # event loop shared by the whole session for AsyncXRequest based clients
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    yield loop
+    loop.run_until_complete(loop.shutdown_asyncgens())
+    loop.close()
 
 
 @pytest.fixture(scope="session", autouse=True)
-def avoid_timeout():
-    def patch(f):
-        @functools.wraps(f)
-        def handler(*args, **kwargs):
-            _retries = 3
-            _polling = 5
+def patch_logger(request):
+    logger.info = hooks.patch_log_info(logger.info)
+    logger.warning = hooks.patch_log_warning(logger.warning)
 
-            for _ in range(_retries):
-                try:
-                    return f(*args, **kwargs)
-                except (requests.exceptions.ConnectTimeout,
-                        requests.exceptions.ReadTimeout,
-                        requests.exceptions.ConnectionError):
-                    time.sleep(_polling)
 
-            return f(*args, **kwargs)
+@pytest.fixture(scope="session", autouse=True)
+def patch_request(request):
+    requests.Session.request = hooks.patch_request(requests.Session.request)
 
-        return handler
 
-    requests.Session.request = patch(requests.Session.request)
+@pytest.fixture(scope="session", autouse=True)
+def avoid_timeout():
+    requests.Session.request = hooks.avoid_timeout(requests.Session.request)
@@ -13,4 +13,17 @@ PASSED_ICON = '✓'
 FAILED_ICON = '✘'
 
 # tenants setup
-MULTI_OMS_CLIENTS = [Clients.LIRUNEX]
\ No newline at end of file
+MULTI_OMS_CLIENTS = [Clients.LIRUNEX]
+
+# values masked in recorded cassettes
+SCRUB_HEADERS = ["authorization", "cookie", "set-cookie"]
+SCRUB_FIELDS = ["password", "token"]
+
+# local state shared between sessions and xdist workers
+CACHE_DIR = PROJECT_ROOT / ".cache"
+TOKEN_CACHE_FILE = CACHE_DIR / "tokens.json"
+LEASE_DIR = CACHE_DIR / "leases"
+DURATIONS_FILE = CACHE_DIR / "durations.json"
+
+# per-endpoint latency baselines, updated explicitly with --perf-baseline update
+PERF_BASELINE_FILE = PROJECT_ROOT / "benchmarks" / "latency_baseline.json"
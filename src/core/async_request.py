@@ -0,0 +1,83 @@
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from src.core.request import XRequest
+from src.core.session import pool_maxsize
+
+_lock = threading.Lock()
+_executor: ThreadPoolExecutor | None = None
+
+
+def get_executor() -> ThreadPoolExecutor:
+    # one worker per pooled socket, more workers would only wait for a free connection
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=pool_maxsize(), thread_name_prefix="xrequest")
+    return _executor
+
+
+def shutdown_executor():
+    global _executor
+    with _lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
+
+
+async def gather(*aws, limit=None):
+    """Await requests with at most `limit` in flight, results keep the input order (XResponse or None on connection error)."""
+    semaphore = asyncio.Semaphore(limit or pool_maxsize())
+
+    async def bounded(aw):
+        async with semaphore:
+            return await aw
+
+    return await asyncio.gather(*(bounded(aw) for aw in aws))
+
+
+class AsyncXRequest:
+    """Asyncio twin of XRequest.
+
+    Calls are executed by the blocking XRequest on a worker pool, so they share the keep-alive connection pool
+    and still go through the requests.Session hooks (patch_request, avoid_timeout) and return XResponse.
+    """
+
+    def __init__(self, headers=None):
+        self._request = XRequest(headers)
+
+    @property
+    def endpoint(self):
+        return self._request.endpoint
+
+    @property
+    def headers(self):
+        return self._request.headers
+
+    @headers.setter
+    def headers(self, value):
+        self._request.headers = value
+
+    async def _run(self, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        ctx = contextvars.copy_context()  # keep the caller's user_headers in the worker thread
+        return await loop.run_in_executor(get_executor(), functools.partial(ctx.run, func, *args, **kwargs))
+
+    async def get(self, url: str, query_param=None, **kwargs):
+        return await self._run(self._request.get, url, query_param, **kwargs)
+
+    async def post(self, url: str, payload, **kwargs):
+        return await self._run(self._request.post, url, payload, **kwargs)
+
+    async def put(self, url: str, payload, **kwargs):
+        return await self._run(self._request.put, url, payload, **kwargs)
+
+    async def patch(self, url: str, payload, **kwargs):
+        return await self._run(self._request.patch, url, payload, **kwargs)
+
+    async def delete(self, url: str, query_param=None, **kwargs):
+        return await self._run(self._request.delete, url, query_param, **kwargs)
@@ -0,0 +1,108 @@
+"""Layers patched onto logger and requests.Session.request by the session fixtures in conftest.py.
+
+Kept importable so the benchmark suite can stack them one by one.
+"""
+import functools
+from contextlib import suppress
+
+from src.core.response import XResponse
+from src.core.retry import send_with_retry, current_retries
+from src.utils.allure_utils import custom_log_info, custom_log_warning, attach_request_response, format_request_response
+from src.utils.cassette_utils import cassette
+from src.utils.datetime_utils import get_current_time
+from src.utils.histogram_utils import latency_recorder
+from src.utils.load_utils import load_stats
+from src.utils.logger_utils import logger, LazyFormat
+from src.utils.traffic_log import traffic_log
+
+# html log lines of the running test, rendered into the allure description, not captured under load
+loggingmsgs = []
+
+
+def patch_log_info(f):
+    @functools.wraps(f)
+    def wrapper(*args, **kwargs):
+        __tracebackhide__ = True
+
+        _logmsgs, *_ = args
+        if not load_stats.active:
+            loggingmsgs.append(custom_log_info(_logmsgs))
+
+        return f(*args, **kwargs)
+
+    return wrapper
+
+
+def patch_log_warning(f):
+    @functools.wraps(f)
+    def wrapper(*args, **kwargs):
+        __tracebackhide__ = True
+
+        _logmsgs, *_ = args
+        if not load_stats.active:
+            loggingmsgs.append(custom_log_warning(_logmsgs))
+
+        return f(*args, **kwargs)
+
+    return wrapper
+
+
+def patch_request(f):
+    @functools.wraps(f)
+    def wrapper(*args, **kwargs):
+        __tracebackhide__ = True
+
+        request_time = get_current_time()
+        with suppress(KeyError):
+            if not kwargs.pop("attach"):
+                request_time = None
+        if load_stats.active:
+            return _record_load(f, *args, **kwargs)
+
+        result = XResponse(_send(f, *args, **kwargs))
+        latency_recorder.record(result.request.method, result.request.path_url, result.time_in_second)
+        if traffic_log.enabled:
+            traffic_log.log(result, current_retries())
+        logger.debug("%s", LazyFormat(format_request_response, result))
+
+        if isinstance(request_time, str):
+            attach_request_response(result, request_time=request_time)
+
+        return result
+
+    return wrapper
+
+
+def _send(f, *args, **kwargs):
+    # serve from / write to the cassette when --replay / --record is used
+    __tracebackhide__ = True
+    if cassette.replaying and (resp := cassette.play(*args, **kwargs)) is not None:
+        return resp
+
+    resp = f(*args, **kwargs)
+    if cassette.recording:
+        cassette.record(resp)
+    return resp
+
+
+def _record_load(f, session, method, url, *args, **kwargs):
+    # virtual users: count every request per endpoint, skip debug log and allure attachments
+    __tracebackhide__ = True
+    try:
+        result = XResponse(_send(f, session, method, url, *args, **kwargs))
+    except Exception:
+        load_stats.record(method, url)
+        raise
+    load_stats.record(method, url, result.status_code)
+    latency_recorder.record(method, result.request.path_url, result.time_in_second)
+    if traffic_log.enabled:
+        traffic_log.log(result, current_retries())
+    return result
+
+
+def avoid_timeout(f):
+    @functools.wraps(f)
+    def handler(*args, **kwargs):
+        return send_with_retry(f, *args, **kwargs)
+
+    return handler
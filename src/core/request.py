@@ -1,12 +1,28 @@
+import contextvars
 import functools
+from contextlib import contextmanager
 
 import requests
 
 from src.core.response import XResponse
+from src.core.session import get_session
 from src.data_runtime import DataRuntime
 from src.utils.logger_utils import logger
 
 
+# headers of the virtual user running in the current thread/task, they take over the client's own headers
+_user_headers = contextvars.ContextVar("user_headers", default=None)
+
+
+@contextmanager
+def user_headers(headers):
+    token = _user_headers.set(headers)
+    try:
+        yield headers
+    finally:
+        _user_headers.reset(token)
+
+
 def __catcherror__(func):
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
@@ -29,9 +45,14 @@ class XRequest:
         self.headers = headers or {}
         self.endpoint = DataRuntime.config.url
 
+    @property
+    def session(self):
+        # Shared keep-alive pool, requests.Session.request hooks still apply to it
+        return get_session()
+
     @property
     def headers(self):
-        return self._headers
+        return _user_headers.get() or self._headers
 
     @headers.setter
     def headers(self, value):
@@ -39,25 +60,25 @@ class XRequest:
 
     @__catcherror__
     def get(self, url: str, query_param=None, **kwargs):
-        resp = XResponse(requests.get(headers=self.headers, url=f"{self.endpoint}{url}", params=query_param, **kwargs))
+        resp = XResponse(self.session.get(headers=self.headers, url=f"{self.endpoint}{url}", params=query_param, **kwargs))
         return resp
 
     @__catcherror__
     def post(self, url: str, payload, **kwargs):
-        resp = XResponse(requests.post(headers=self.headers, url=f"{self.endpoint}{url}", json=payload, **kwargs))
+        resp = XResponse(self.session.post(headers=self.headers, url=f"{self.endpoint}{url}", json=payload, **kwargs))
         return resp
 
     @__catcherror__
     def put(self, url: str, payload, **kwargs):
-        resp = XResponse(requests.put(headers=self.headers, url=f"{self.endpoint}{url}", json=payload, **kwargs))
+        resp = XResponse(self.session.put(headers=self.headers, url=f"{self.endpoint}{url}", json=payload, **kwargs))
         return resp
 
     @__catcherror__
     def patch(self, url: str, payload, **kwargs):
-        resp = XResponse(requests.patch(headers=self.headers, url=f"{self.endpoint}{url}", json=payload, **kwargs))
+        resp = XResponse(self.session.patch(headers=self.headers, url=f"{self.endpoint}{url}", json=payload, **kwargs))
         return resp
 
     @__catcherror__
     def delete(self, url: str, query_param=None, **kwargs):
-        resp = XResponse(requests.delete(headers=self.headers, url=f"{self.endpoint}{url}", params=query_param, **kwargs))
+        resp = XResponse(self.session.delete(headers=self.headers, url=f"{self.endpoint}{url}", params=query_param, **kwargs))
         return resp
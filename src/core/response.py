@@ -2,25 +2,62 @@ import functools
 import json
 import math
 import operator
-import re
 from contextlib import suppress
 from json import JSONDecodeError
 
-import jsonschema
-
 from src.consts import PASSED_ICON, FAILED_ICON
 from src.utils.assert_utils import soft_assert, assert_log
+from src.utils.json_utils import compile_key_path, resolve_many, mask_json
 from src.utils.logger_utils import logger
+from src.utils.schema_utils import iter_schema_errors, format_error_path
+
+
+_UNPARSED = object()
+_MISSING_KEY = r"[~~missing-key-~~]"
+
+PAYLOAD_OPS = {
+    "equals": operator.eq,
+    "not equals": operator.ne,
+    "greater than": operator.gt,
+    "less than": operator.lt,
+    "greater or equals": operator.ge,
+    "less than or equals": operator.le,
+    "end with": lambda a, b: a.endswith(b),
+    "contains": operator.contains,
+    "not contains": lambda a, b: b not in a,
+}
+
+
+def _compare(actual, expected, ops):
+    try:
+        if ops == operator.contains and isinstance(actual, dict) and isinstance(expected, dict):
+            return actual.items() >= expected.items()
+        return ops(actual, expected)
+    except Exception:
+        return False
+
+
+def _compact(value):
+    return json.dumps(value, default=str) if isinstance(value, (dict, list)) else repr(value)
 
 
 class XResponse:
     def __init__(self, resp):
         self._resp = resp
+        self._json = _UNPARSED
 
     def json(self, **kwargs):
-        with suppress(JSONDecodeError):
-            return self._resp.json(**kwargs)
-        return {}
+        # body is decoded once and shared by every check, don't mutate the returned object
+        if kwargs:
+            with suppress(JSONDecodeError):
+                return self._resp.json(**kwargs)
+            return {}
+
+        if self._json is _UNPARSED:
+            self._json = {}
+            with suppress(JSONDecodeError):
+                self._json = self._resp.json()
+        return self._json
 
     def __getattr__(self, attr):
         return getattr(self._resp, attr)
@@ -67,35 +104,27 @@ class XResponse:
 
     def check_jsonschema(self, schema):
         msg = "Verify JSON schema"
-        try:
-            jsonschema.validate(instance=self._resp.json(), schema=schema)
-            logger.info(f"{PASSED_ICON} {msg}")
-        except jsonschema.ValidationError as e:
+        if errors := iter_schema_errors(self.json(), schema):
             logger.warning(f"{FAILED_ICON} {msg}")
-            logger.warning(f"  JSON schema validation failed: {e.message} [{'.'.join([item for item in e.path])}]")
+            for error in errors:
+                logger.warning(f"  JSON schema validation failed: {error.message} [{format_error_path(error)}]")
             soft_assert(False, msg)
-
+        else:
+            logger.info(f"{PASSED_ICON} {msg}")
 
     def __check_payload__(self, expected, *, key=None, ops, method):
         msg = "Verify payload"
         if key:
             msg += f" (Key: {key})"
-            _path = map(lambda x: int(x) if x.isdigit() else x, filter(None, re.split(r'[\[.\]]', key)))
             try:
-                actual = functools.reduce(operator.getitem, _path, self.json())
-            except (IndexError, TypeError):
-                actual = r"[~~missing-key-~~]"
+                actual = compile_key_path(key).resolve(self.json())
+            except (KeyError, IndexError, TypeError):
+                actual = _MISSING_KEY
         else:
             msg += " (Full payload)"
             actual = self.json()
 
-        try:
-            if ops == operator.contains and isinstance(actual, dict) and isinstance(expected, dict):
-                res = actual.items() >= expected.items()
-            else:
-                res = ops(actual, expected)
-        except Exception:
-            res = False
+        res = _compare(actual, expected, ops)
 
         if isinstance(actual, dict):
             actual = json.dumps(actual, indent=4)
@@ -115,29 +144,65 @@ class XResponse:
         for _msg in printmsg:
             printlog(_msg)
 
-    check_payload_equals = functools.partialmethod(__check_payload__, ops=operator.eq, method="equals")
-    check_payload_not_equals = functools.partialmethod(__check_payload__, ops=operator.ne, method="not equals")
-    check_payload_greater_than = functools.partialmethod(__check_payload__, ops=operator.gt, method="greater than")
-    check_payload_less_than = functools.partialmethod(__check_payload__, ops=operator.lt, method="less than")
-    check_payload_greater_equals = functools.partialmethod(__check_payload__, ops=operator.ge, method="greater or equals")
-    check_payload_less_equals = functools.partialmethod(__check_payload__, ops=operator.le, method="less than or equals")
-    check_payload_endswith = functools.partialmethod(__check_payload__, ops=lambda a, b: a.endswith(b), method="end with")
-    check_payload_contains = functools.partialmethod(__check_payload__, ops=operator.contains, method="contains")
-    check_payload_not_contains = functools.partialmethod(__check_payload__, ops=lambda a, b: b not in a, method="not contains")
+    check_payload_equals = functools.partialmethod(__check_payload__, ops=PAYLOAD_OPS["equals"], method="equals")
+    check_payload_not_equals = functools.partialmethod(__check_payload__, ops=PAYLOAD_OPS["not equals"], method="not equals")
+    check_payload_greater_than = functools.partialmethod(__check_payload__, ops=PAYLOAD_OPS["greater than"], method="greater than")
+    check_payload_less_than = functools.partialmethod(__check_payload__, ops=PAYLOAD_OPS["less than"], method="less than")
+    check_payload_greater_equals = functools.partialmethod(__check_payload__, ops=PAYLOAD_OPS["greater or equals"], method="greater or equals")
+    check_payload_less_equals = functools.partialmethod(__check_payload__, ops=PAYLOAD_OPS["less than or equals"], method="less than or equals")
+    check_payload_endswith = functools.partialmethod(__check_payload__, ops=PAYLOAD_OPS["end with"], method="end with")
+    check_payload_contains = functools.partialmethod(__check_payload__, ops=PAYLOAD_OPS["contains"], method="contains")
+    check_payload_not_contains = functools.partialmethod(__check_payload__, ops=PAYLOAD_OPS["not contains"], method="not contains")
     del __check_payload__
 
-    def cash_request_to_curl(self):
-        # Format request content
+    def check_payload(self, checks: dict, max_rows=5):
+        """Verify many keys in one traversal of the body.
+
+        checks: {key: expected} or {key: (method, expected)} with method one of PAYLOAD_OPS ("equals" by default).
+        Keys accept '*' wildcards ('result[*].symbol'), every matched row must pass and a key matching nothing fails.
+        """
+        specs = {key: spec if isinstance(spec, tuple) else ("equals", spec) for key, spec in checks.items()}
+        matches = resolve_many(self.json(), specs)
+
+        printmsg = []
+        failed = 0
+        for key, (method, expected) in specs.items():
+            ops = PAYLOAD_OPS[method]
+            rows = matches[key]
+            bad_rows = [(path, actual) for path, actual in rows if not _compare(actual, expected, ops)] if rows else [(key, _MISSING_KEY)]
+
+            if not bad_rows:
+                scope = f" ({len(rows)} rows)" if compile_key_path(key).has_wildcard else ""
+                printmsg.append((logger.info, f"  {PASSED_ICON} {key}{scope} [{method.upper()}] {_compact(expected)}"))
+                continue
+
+            failed += 1
+            soft_assert(False, f"Verify payload (Key: {key})")
+            actual = {path: value for path, value in bad_rows[:max_rows]} if compile_key_path(key).has_wildcard else bad_rows[0][1]
+            more = f" (+{len(bad_rows) - max_rows} rows)" if len(bad_rows) > max_rows else ""
+            printmsg.append((logger.warning, f"  {FAILED_ICON} {key} [{method.upper()}] {_compact(expected)} \t [Actual]: {_compact(actual)}{more}"))
+
+        msg = f"Verify payload ({len(specs)} keys)"
+        if failed:
+            logger.warning(f"{FAILED_ICON} {msg} - {failed} failed")
+        else:
+            logger.info(f"{PASSED_ICON} {msg}")
+
+        for printlog, _msg in printmsg:
+            printlog(_msg)
+
+    def cash_request_to_curl(self, mask=None):
+        # Format request content, values of headers and json keys matching the `mask` pattern are hidden
         method = self._resp.request.method.upper()
         lines = [f"curl --location --request {method} '{self._resp.request.url}'"]
 
         for key, value in self._resp.request.headers.items():
-            lines.append(f"--header '{key}: {value}'")
+            lines.append(f"--header '{key}: {'***' if mask and mask.search(key) else value}'")
 
         if self._resp.request.body and isinstance(self._resp.request.body, (str, bytes)):
             try:
                 data = json.loads(self._resp.request.body)
-                json_data = json.dumps(data)  # compact form
+                json_data = json.dumps(mask_json(data, mask) if mask else data)  # compact form
 
             except Exception:
                 json_data = self._resp.request.body.decode() if isinstance(self._resp.request.body, bytes) else self._resp.request.body
@@ -0,0 +1,169 @@
+import random
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from urllib.parse import urlsplit
+
+import requests
+from urllib3.exceptions import NewConnectionError
+
+# methods safe to send twice, a POST placing an order is never replayed once it may have reached the server
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+RETRYABLE_ERRORS = (requests.exceptions.ConnectTimeout,
+                    requests.exceptions.ReadTimeout,
+                    requests.exceptions.ConnectionError)
+
+
+# retries already spent on the request being sent, read by the layers under avoid_timeout (traffic log)
+_attempt: ContextVar[int] = ContextVar("attempt", default=0)
+
+
+def current_retries():
+    return _attempt.get()
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Host is considered down, the request was not sent."""
+
+
+def is_not_sent(error):
+    # connect timeout / refused connection: nothing reached the server
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    reason = getattr(error.args[0], "reason", None) if error.args else None
+    return isinstance(reason, NewConnectionError)
+
+
+@dataclass
+class RetryPolicy:
+    retries: int = 3
+    backoff: float = 0.5  # first retry waits up to `backoff` seconds, doubled on each attempt
+    max_backoff: float = 8.0
+    budget: float = 60.0  # seconds a request may spend across all attempts and waits
+    timeout: float = 30.0  # per attempt, when the caller doesn't pass one
+
+    def delay(self, attempt):
+        # exponential backoff with full jitter
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def can_retry(self, method, error):
+        if isinstance(error, CircuitOpenError):
+            return False
+        return method.upper() in IDEMPOTENT_METHODS or is_not_sent(error)
+
+
+@dataclass
+class HostStats:
+    retries: int = 0
+    retry_time: float = 0.0
+    failures: int = 0
+    breaker_opens: int = 0
+    fast_failed: int = 0
+
+
+@dataclass
+class _Circuit:
+    failures: int = 0
+    opened_at: float | None = None
+    probing: bool = False
+
+
+@dataclass
+class CircuitBreaker:
+    threshold: int = 5  # consecutive connection failures before the host is marked down
+    cooldown: float = 30.0  # seconds before a single probe request is let through again
+    _circuits: dict = field(default_factory=dict)
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def before(self, host):
+        with self._lock:
+            circuit = self._circuits.setdefault(host, _Circuit())
+            if circuit.opened_at is None:
+                return
+            if circuit.probing or time.monotonic() - circuit.opened_at < self.cooldown:
+                retry_stats.record(host, fast_failed=1)
+                raise CircuitOpenError(f"Circuit open for {host}, failing fast")
+            circuit.probing = True  # half-open: this request is the probe
+
+    def success(self, host):
+        with self._lock:
+            self._circuits[host] = _Circuit()
+
+    def failure(self, host):
+        with self._lock:
+            circuit = self._circuits.setdefault(host, _Circuit())
+            circuit.failures += 1
+            if circuit.probing or (circuit.opened_at is None and circuit.failures >= self.threshold):
+                circuit.opened_at = time.monotonic()
+                circuit.probing = False
+                retry_stats.record(host, breaker_opens=1)
+
+    def end_probe(self, host):
+        # whatever the probe raised, the next request after the cooldown may probe again
+        with self._lock:
+            if circuit := self._circuits.get(host):
+                circuit.probing = False
+
+    def reset(self):
+        with self._lock:
+            self._circuits.clear()
+
+
+class RetryStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hosts: dict[str, HostStats] = {}
+
+    def record(self, host, **counters):
+        with self._lock:
+            stats = self.hosts.setdefault(host, HostStats())
+            for name, value in counters.items():
+                setattr(stats, name, getattr(stats, name) + value)
+
+
+retry_policy = RetryPolicy()
+circuit_breaker = CircuitBreaker()
+retry_stats = RetryStats()
+
+
+def _clamp_timeout(timeout, cap):
+    """`timeout` (seconds or the (connect, read) tuple requests accepts) capped at `cap` seconds."""
+    if isinstance(timeout, tuple):
+        return tuple(cap if part is None else min(part, cap) for part in timeout)
+    return min(timeout, cap)
+
+
+def send_with_retry(f, session, method, url, *args, policy=None, breaker=None, **kwargs):
+    """Call `f(session, method, url, ...)` under the retry policy and the host circuit breaker."""
+    policy = policy or retry_policy
+    breaker = breaker or circuit_breaker
+    host = urlsplit(url).netloc
+    deadline = time.monotonic() + policy.budget
+    timeout = kwargs.pop("timeout", None) or policy.timeout
+
+    attempt = 0
+    while True:
+        breaker.before(host)
+        remaining = deadline - time.monotonic()
+        token = _attempt.set(attempt)
+        try:
+            resp = f(session, method, url, *args, timeout=_clamp_timeout(timeout, max(remaining, 0.1)), **kwargs)
+        except RETRYABLE_ERRORS as error:
+            breaker.failure(host)
+            retry_stats.record(host, failures=1)
+
+            wait = policy.delay(attempt)
+            if attempt >= policy.retries or not policy.can_retry(method, error) or time.monotonic() + wait >= deadline:
+                raise
+            attempt += 1
+            retry_stats.record(host, retries=1, retry_time=wait)
+            time.sleep(wait)
+            continue
+        finally:
+            _attempt.reset(token)
+            breaker.end_probe(host)
+
+        breaker.success(host)
+        return resp
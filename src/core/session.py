@@ -0,0 +1,83 @@
+import threading
+from http.cookiejar import DefaultCookiePolicy
+
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_POOL_CONNECTIONS = 4  # number of per-host pools kept alive
+DEFAULT_POOL_MAXSIZE = 10  # number of sockets kept alive per host
+
+_lock = threading.Lock()
+_session: requests.Session | None = None
+_settings = dict(pool_connections=DEFAULT_POOL_CONNECTIONS, pool_maxsize=DEFAULT_POOL_MAXSIZE, keep_alive=True)
+
+
+def configure_session(*, pool_connections=None, pool_maxsize=None, keep_alive=None):
+    """Update pool settings, the shared session is rebuilt on next use."""
+    global _session
+    with _lock:
+        for key, value in dict(pool_connections=pool_connections, pool_maxsize=pool_maxsize, keep_alive=keep_alive).items():
+            if value is not None:
+                _settings[key] = value
+
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+def get_session() -> requests.Session:
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                _session = _build_session(**_settings)
+    return _session
+
+
+def close_session():
+    global _session
+    with _lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+def pool_stats():
+    """Per-host stats of the shared pool: sockets opened, requests sent and idle sockets ready for reuse."""
+    if _session is None:
+        return {}
+
+    stats = {}
+    for adapter in _session.adapters.values():
+        pools = adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            stats[f"{pool.scheme}://{pool.host}:{pool.port}"] = dict(
+                opened=pool.num_connections,
+                requests=pool.num_requests,
+                idle=sum(conn is not None for conn in pool.pool.queue) if pool.pool else 0,
+                maxsize=_settings["pool_maxsize"],
+            )
+    return stats
+
+
+def _build_session(*, pool_connections, pool_maxsize, keep_alive):
+    session = requests.Session()
+
+    # Clients share the pool but not the cookie jar, each request must stay as isolated as requests.get(...)
+    session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+    if not keep_alive:
+        session.headers["Connection"] = "close"
+
+    return session
+
+
+def pool_maxsize():
+    return _settings["pool_maxsize"]
@@ -2,5 +2,5 @@ from src.utils import Dotdict
 
 
 class DataRuntime:
-    option: Dotdict
-    config: Dotdict
+    option: Dotdict = None
+    config: Dotdict = None
@@ -1,24 +1,31 @@
+import functools
+import hashlib
+
 from src.consts import MULTI_OMS_CLIENTS
+from src.core.async_request import AsyncXRequest
 from src.core.request import XRequest
 from src.data_runtime import DataRuntime
 from src.enums.system import Clients, AccountType
 from src.utils import Dotdict
+from src.utils.token_cache import token_cache
 
 
 class CompanyLogin:
+    url_map = {
+        Clients.LIRUNEX: {
+            AccountType.CRM: "/api/auth/v1/company/login",
+            AccountType.LIVE: "/api/auth/v2/company/live/login",
+            AccountType.DEMO: "/api/auth/v2/company/demo/login"
+        },
+        Clients.TRANSACTCLOUD: {
+            AccountType.LIVE: "/api/auth/v2/metatrader5/live/login",
+            AccountType.DEMO: "/api/auth/v2/metatrader5/demo/login"
+        }
+    }
+
     def __new__(cls, headers=None, *args, **kwargs):
         instance = super().__new__(cls)
-        url_map = Dotdict({
-            Clients.LIRUNEX: {
-                AccountType.CRM: "/api/auth/v1/company/login",
-                AccountType.LIVE: "/api/auth/v2/company/live/login",
-                AccountType.DEMO: "/api/auth/v2/company/demo/login"
-            },
-            Clients.TRANSACTCLOUD: {
-                AccountType.LIVE: "/api/auth/v2/metatrader5/live/login",
-                AccountType.DEMO: "/api/auth/v2/metatrader5/demo/login"
-            }
-        })
+        url_map = Dotdict(cls.url_map)
 
         # select url based on client + handle external client
         default_client = Clients.LIRUNEX if DataRuntime.option.client in MULTI_OMS_CLIENTS else Clients.TRANSACTCLOUD
@@ -26,7 +33,6 @@ class CompanyLogin:
 
         return instance
 
-
     def __init__(self, headers=None):
         self.request = XRequest(headers)
 
@@ -43,90 +49,123 @@ class CompanyLogin:
         resp = self.request.post(self.url, payload, **kwargs)
         return resp
 
-    def authenticate(self, user_id=None, password=None, source="WEB"):
+    def login(self, user_id=None, password=None, source="WEB"):
         resp = self.post(self.required_payload(user_id, password, source), attach=False)
         assert resp.status_code == 200, f"Authentication failed with status code {resp.status_code}!!!"
 
         resp_data = Dotdict(resp.json())
-        self.request.headers |= dict(userId=user_id, authorization=f"Bearer {resp_data.result.token}")
+        return resp_data.result.token
+
+    def authenticate(self, user_id=None, password=None, source="WEB", use_cache=True):
+        login = functools.partial(self.login, user_id, password, source)
+        token = token_cache.get_or_login(self.cache_key(user_id, source, password), login) if use_cache else login()
+
+        self.request.headers |= dict(userId=user_id, authorization=f"Bearer {token}")
         return self.request.headers
 
+    def cache_key(self, user_id=None, source="WEB", password=None):
+        # the password is part of the key so a wrong password never gets a cached token, only its digest is stored
+        option = DataRuntime.option
+        secret = hashlib.sha256(str(password or DataRuntime.config.password).encode()).hexdigest()[:16]
+        return "|".join([DataRuntime.config.url, option.client, option.server, option.account, str(user_id or DataRuntime.config.user), source.upper(), secret])
 
     ### schema ###
-    @property
-    def schema(self):
-        return {
-            "type": "object",
-            "properties": {
-                "code": {
-                    "type": "string"
-                },
-                "result": {
-                    "type": "object",
-                    "properties": {
-                        "token": {
-                            "type": "string"
-                        },
-                        "user": {
-                            "type": "object",
-                            "properties": {
-                                "source": {
-                                    "type": "string"
-                                },
-                                "metatraderId": {
-                                    "type": "string"
-                                },
-                                "metatraderGroup": {
-                                    "type": "string"
-                                },
-                                "isDemo": {
-                                    "type": "boolean"
-                                },
-                                "traderSubcription": {
-                                    "type": "string"
-                                },
-                                "marketSubcription": {
-                                    "type": "string"
-                                },
-                                "traderSubscription": {
-                                    "type": "string"
-                                },
-                                "marketSubscription": {
-                                    "type": "string"
-                                },
-                                "tenantId": {
-                                    "type": "string"
-                                },
-                                "mainProductCode": {
-                                    "type": "string"
-                                },
-                                "omsServerId": {
-                                    "type": "string"
-                                }
-                            },
-                            "required": [
-                                "source",
-                                "metatraderId",
-                                "metatraderGroup",
-                                "isDemo",
-                                "traderSubcription",
-                                "marketSubcription",
-                                "traderSubscription",
-                                "marketSubscription",
-                                "tenantId",
-                                "mainProductCode",
-                                "omsServerId",
-                            ]
-                        }
-                    },
-                    "required": [
-                        "token",
-                        "user"
-                    ]
-                }
+    schema = {
+        "type": "object",
+        "properties": {
+            "code": {
+                "type": "string"
             },
-            "required": [
-                "code",
-                "result",
-            ]
-        }
+            "result": {
+                "type": "object",
+                "properties": {
+                    "token": {
+                        "type": "string"
+                    },
+                    "user": {
+                        "type": "object",
+                        "properties": {
+                            "source": {
+                                "type": "string"
+                            },
+                            "metatraderId": {
+                                "type": "string"
+                            },
+                            "metatraderGroup": {
+                                "type": "string"
+                            },
+                            "isDemo": {
+                                "type": "boolean"
+                            },
+                            "traderSubcription": {
+                                "type": "string"
+                            },
+                            "marketSubcription": {
+                                "type": "string"
+                            },
+                            "traderSubscription": {
+                                "type": "string"
+                            },
+                            "marketSubscription": {
+                                "type": "string"
+                            },
+                            "tenantId": {
+                                "type": "string"
+                            },
+                            "mainProductCode": {
+                                "type": "string"
+                            },
+                            "omsServerId": {
+                                "type": "string"
+                            }
+                        },
+                        "required": [
+                            "source",
+                            "metatraderId",
+                            "metatraderGroup",
+                            "isDemo",
+                            "traderSubcription",
+                            "marketSubcription",
+                            "traderSubscription",
+                            "marketSubscription",
+                            "tenantId",
+                            "mainProductCode",
+                            "omsServerId",
+                        ]
+                    }
+                },
+                "required": [
+                    "token",
+                    "user"
+                ]
+            }
+        },
+        "required": [
+            "code",
+            "result",
+        ]
+    }
+
+
+class AsyncCompanyLogin(CompanyLogin):
+    def __init__(self, headers=None):
+        self.request = AsyncXRequest(headers)
+
+    ### method ###
+    async def post(self, payload, **kwargs):
+        resp = await self.request.post(self.url, payload, **kwargs)
+        return resp
+
+    async def login(self, user_id=None, password=None, source="WEB"):
+        resp = await self.post(self.required_payload(user_id, password, source), attach=False)
+        assert resp.status_code == 200, f"Authentication failed with status code {resp.status_code}!!!"
+
+        resp_data = Dotdict(resp.json())
+        return resp_data.result.token
+
+    async def authenticate(self, user_id=None, password=None, source="WEB", use_cache=True):
+        login = functools.partial(self.login, user_id, password, source)
+        token = await token_cache.get_or_login_async(self.cache_key(user_id, source, password), login) if use_cache else await login()
+
+        self.request.headers |= dict(userId=user_id, authorization=f"Bearer {token}")
+        return self.request.headers
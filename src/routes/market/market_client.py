@@ -1,6 +1,6 @@
 from src.data_runtime import DataRuntime
 from src.routes.auth.company_login import CompanyLogin
-from src.routes.market.pending import Pending
+from src.routes.market.pending import Pending, AsyncPending
 
 
 class MarketClient:
@@ -8,3 +8,10 @@ class MarketClient:
         if not headers:
             headers = CompanyLogin().authenticate()
         self.pending = Pending(headers)
+
+
+class AsyncMarketClient:
+    def __init__(self, headers=None):
+        if not headers:
+            headers = CompanyLogin().authenticate()
+        self.pending = AsyncPending(headers)
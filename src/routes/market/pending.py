@@ -1,3 +1,4 @@
+from src.core.async_request import AsyncXRequest, gather
 from src.core.request import XRequest
 
 
@@ -12,3 +13,17 @@ class Pending:
         return resp
 
     ### schema ###
+
+
+class AsyncPending(Pending):
+    def __init__(self, headers):
+        super().__init__(headers)
+        self.request = AsyncXRequest(headers)
+
+    ### method ###
+    async def get(self, params, **kwargs):
+        resp = await self.request.get(self.url, params, **kwargs)
+        return resp
+
+    async def get_many(self, params_list, limit=None, **kwargs):
+        return await gather(*(self.get(params, **kwargs) for params in params_list), limit=limit)
@@ -1,11 +1,12 @@
-from src.routes.base_api import BaseAPI
+from src.core.request import XRequest
 
 
-class Company(BaseAPI):
-    def __init__(self):
-        super().__init__()
-        self._url = "/api/config/v1/company"
+class Company:
+    def __init__(self, headers=None):
+        self.request = XRequest(headers)
+        self.url = "/api/config/v1/company"
 
-    def get(self, params=None):
-        resp = self.request.get(self._url, params)
+    ### method ###
+    def get(self, params=None, **kwargs):
+        resp = self.request.get(self.url, params, **kwargs)
         return resp
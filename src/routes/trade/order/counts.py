@@ -0,0 +1,26 @@
+from src.core.async_request import AsyncXRequest
+from src.core.request import XRequest
+
+
+class Counts:
+    def __init__(self, headers):
+        self.request = XRequest(headers)
+        self.url = "/api/order/v1/counts"
+
+    ### method ###
+    def get(self, params=None, **kwargs):
+        resp = self.request.get(self.url, params, **kwargs)
+        return resp
+
+    ### schema ###
+
+
+class AsyncCounts(Counts):
+    def __init__(self, headers):
+        super().__init__(headers)
+        self.request = AsyncXRequest(headers)
+
+    ### method ###
+    async def get(self, params=None, **kwargs):
+        resp = await self.request.get(self.url, params, **kwargs)
+        return resp
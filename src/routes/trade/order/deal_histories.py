@@ -0,0 +1,64 @@
+from src.core.async_request import AsyncXRequest
+from src.core.request import XRequest
+from src.utils.pagination_utils import PageIterator
+
+
+class DealHistories:
+    def __init__(self, headers):
+        self.request = XRequest(headers)
+        self.url = "/api/order/v1/deal-histories"
+
+    ### method ###
+    def get(self, params=None, **kwargs):
+        resp = self.request.get(self.url, params, **kwargs)
+        return resp
+
+    def iter_rows(self, params=None, page_size=100, prefetch=2, **kwargs):
+        """Stream every deal, page by page, see PageIterator."""
+        return PageIterator(self.get, params, page_size=page_size, prefetch=prefetch, **kwargs)
+
+    ### schema ###
+    row_schema = {
+        "type": "object",
+        "properties": {
+            "orderId": {
+                "type": "integer"
+            },
+            "symbol": {
+                "type": "string"
+            },
+            "type": {
+                "type": "string"
+            },
+            "volume": {
+                "type": "number"
+            },
+            "price": {
+                "type": "number"
+            },
+            "createTime": {
+                "type": "integer"
+            }
+        },
+        "required": [
+            "orderId",
+            "symbol",
+            "type",
+            "volume",
+        ]
+    }
+
+
+class AsyncDealHistories(DealHistories):
+    def __init__(self, headers):
+        super().__init__(headers)
+        self.request = AsyncXRequest(headers)
+
+    ### method ###
+    async def get(self, params=None, **kwargs):
+        resp = await self.request.get(self.url, params, **kwargs)
+        return resp
+
+    def iter_rows(self, params=None, page_size=100, prefetch=2, **kwargs):
+        # pages are prefetched on the request pool already, iterate with the blocking twin
+        return DealHistories(self.request.headers).iter_rows(params, page_size, prefetch, **kwargs)
@@ -0,0 +1,26 @@
+from src.core.async_request import AsyncXRequest
+from src.core.request import XRequest
+
+
+class PendingDetails:
+    def __init__(self, headers):
+        self.request = XRequest(headers)
+        self.url = "/api/order/v1/pending-details"
+
+    ### method ###
+    def get(self, order_id, **kwargs):
+        resp = self.request.get(self.url, dict(orderId=order_id), **kwargs)
+        return resp
+
+    ### schema ###
+
+
+class AsyncPendingDetails(PendingDetails):
+    def __init__(self, headers):
+        super().__init__(headers)
+        self.request = AsyncXRequest(headers)
+
+    ### method ###
+    async def get(self, order_id, **kwargs):
+        resp = await self.request.get(self.url, dict(orderId=order_id), **kwargs)
+        return resp
@@ -0,0 +1,55 @@
+import time
+
+from src.core.async_request import AsyncXRequest, gather
+from src.core.request import XRequest
+from src.utils.bulk_utils import bulk_stats, batched
+
+
+class Bulk:
+    def __init__(self, headers):
+        self.request = XRequest(headers)
+        self.url = "/api/trade/v1/order/bulk"
+
+    ### payload ###
+    def required_payload(self, orders):  # noqa
+        return dict(orders=orders)
+
+    ### method ###
+    def post(self, payload, **kwargs):
+        resp = self.request.post(self.url, payload, **kwargs)
+        return resp
+
+    def place(self, orders, **kwargs):
+        start = time.perf_counter()
+        resp = self.post(self.required_payload(orders), **kwargs)
+        elapsed = time.perf_counter() - start
+        bulk_stats.record_batch(f"POST {self.url}", len(orders), resp, elapsed)
+        bulk_stats.record_run(f"POST {self.url}", elapsed)
+        return resp
+
+    ### schema ###
+
+
+class AsyncBulk(Bulk):
+    def __init__(self, headers):
+        super().__init__(headers)
+        self.request = AsyncXRequest(headers)
+
+    ### method ###
+    async def post(self, payload, **kwargs):
+        resp = await self.request.post(self.url, payload, **kwargs)
+        return resp
+
+    async def place(self, orders, **kwargs):
+        start = time.perf_counter()
+        resp = await self.post(self.required_payload(orders), **kwargs)
+        bulk_stats.record_batch(f"POST {self.url}", len(orders), resp, time.perf_counter() - start)
+        return resp
+
+    async def place_many(self, orders, batch_size=100, limit=None, **kwargs):
+        """Split `orders` into batches submitted concurrently, at most `limit` batches in flight."""
+        start = time.perf_counter()
+        try:
+            return await gather(*(self.place(batch, **kwargs) for batch in batched(orders, batch_size)), limit=limit)
+        finally:
+            bulk_stats.record_run(f"POST {self.url}", time.perf_counter() - start)
@@ -0,0 +1,41 @@
+from src.core.async_request import AsyncXRequest
+from src.core.request import XRequest
+
+
+class Trade:
+    def __init__(self, headers):
+        self.request = XRequest(headers)
+        self.url = "/api/trade/v1/order"
+
+    ### payload ###
+    def required_payload(self, symbol, order_type="BUY", volume=0.01, price=None, **fields):  # noqa
+        payload = dict(symbol=symbol, type=order_type, volume=volume, **fields)
+        if price is not None:
+            payload["price"] = price
+        return payload
+
+    ### method ###
+    def post(self, payload, **kwargs):
+        resp = self.request.post(self.url, payload, **kwargs)
+        return resp
+
+    def delete(self, order_id, **kwargs):
+        resp = self.request.delete(self.url, dict(orderId=order_id), **kwargs)
+        return resp
+
+    ### schema ###
+
+
+class AsyncTrade(Trade):
+    def __init__(self, headers):
+        super().__init__(headers)
+        self.request = AsyncXRequest(headers)
+
+    ### method ###
+    async def post(self, payload, **kwargs):
+        resp = await self.request.post(self.url, payload, **kwargs)
+        return resp
+
+    async def delete(self, order_id, **kwargs):
+        resp = await self.request.delete(self.url, dict(orderId=order_id), **kwargs)
+        return resp
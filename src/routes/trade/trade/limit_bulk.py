@@ -0,0 +1,15 @@
+from src.routes.trade.trade.bulk import Bulk, AsyncBulk
+
+
+class LimitBulk(Bulk):
+    def __init__(self, headers):
+        super().__init__(headers)
+        self.url = "/api/trade/v1/order/limit/bulk"
+
+    ### schema ###
+
+
+class AsyncLimitBulk(AsyncBulk):
+    def __init__(self, headers):
+        super().__init__(headers)
+        self.url = "/api/trade/v1/order/limit/bulk"
@@ -0,0 +1,34 @@
+from src.routes.auth.company_login import CompanyLogin
+from src.routes.market.pending import Pending, AsyncPending
+from src.routes.trade.order.counts import Counts, AsyncCounts
+from src.routes.trade.order.deal_histories import DealHistories, AsyncDealHistories
+from src.routes.trade.order.pending_details import PendingDetails, AsyncPendingDetails
+from src.routes.trade.trade.bulk import Bulk, AsyncBulk
+from src.routes.trade.trade.general import Trade, AsyncTrade
+from src.routes.trade.trade.limit_bulk import LimitBulk, AsyncLimitBulk
+
+
+class TradeClient:
+    def __init__(self, headers=None):
+        if not headers:
+            headers = CompanyLogin().authenticate()
+        self.trade = Trade(headers)
+        self.bulk = Bulk(headers)
+        self.limit_bulk = LimitBulk(headers)
+        self.pending = Pending(headers)
+        self.pending_details = PendingDetails(headers)
+        self.deal_histories = DealHistories(headers)
+        self.counts = Counts(headers)
+
+
+class AsyncTradeClient:
+    def __init__(self, headers=None):
+        if not headers:
+            headers = CompanyLogin().authenticate()
+        self.trade = AsyncTrade(headers)
+        self.bulk = AsyncBulk(headers)
+        self.limit_bulk = AsyncLimitBulk(headers)
+        self.pending = AsyncPending(headers)
+        self.pending_details = AsyncPendingDetails(headers)
+        self.deal_histories = AsyncDealHistories(headers)
+        self.counts = AsyncCounts(headers)
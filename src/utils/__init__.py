@@ -1,19 +1,99 @@
 class Dotdict(dict):
+    """Attribute access over json/yaml data.
+
+    Nested dicts/lists are returned as views created on first access and cached, the underlying data is never
+    rewritten. A view is a shallow copy of its node that writes through: a change made through it is applied to the
+    node too, so the parent (json.dumps, items, deepcopy) sees it. The same view is returned until the parent key is
+    reassigned.
+    """
+    __slots__ = ("_views", "_raw")
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        object.__setattr__(self, "_views", None)
+        object.__setattr__(self, "_raw", None)
+
     def __getattr__(self, key):
+        if key.startswith("__") or key in Dotdict.__slots__:
+            raise AttributeError(key)
         return self[key]
 
     def __setattr__(self, key, value):
+        if key in Dotdict.__slots__:
+            object.__setattr__(self, key, value)
+            return
         self[key] = value
 
     def __getitem__(self, key):
         res = super().__getitem__(key)
-        if isinstance(res, dict):
-            self[key] = Dotdict(res)
-        elif isinstance(res, list):
-            for i in range(len(res)):
-                if isinstance(res[i], dict):
-                    res[i] = Dotdict(res[i])
-        return super().__getitem__(key)  # reload value again to get dotdict effect
+        if type(res) is dict or type(res) is list:
+            return _view(self, key, res)
+        return res
 
     def __missing__(self, key):
         return rf"[~~missing-key-{key}~~]"
+
+    def __getstate__(self):
+        return None  # views are rebuilt on access, a copy doesn't write through to the original node
+
+
+class DotList(list):
+    """List view of a json array, dict items are wrapped as Dotdict on access only."""
+    __slots__ = ("_views", "_raw")
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        object.__setattr__(self, "_views", None)
+        object.__setattr__(self, "_raw", None)
+
+    def __getitem__(self, index):
+        res = super().__getitem__(index)
+        if isinstance(index, slice):
+            return DotList(res)
+        if type(res) is dict or type(res) is list:
+            return _view(self, index if index >= 0 else len(self) + index, res)
+        return res
+
+    def __iter__(self):
+        for index, res in enumerate(super().__iter__()):
+            yield _view(self, index, res) if type(res) is dict or type(res) is list else res
+
+    def __getstate__(self):
+        return None
+
+
+def _write_through(base, name):
+    method = getattr(base, name)
+
+    def wrapper(self, *args, **kwargs):
+        result = method(self, *args, **kwargs)
+        if (raw := getattr(self, "_raw", None)) is not None:
+            method(raw, *args, **kwargs)
+        return result
+
+    wrapper.__name__ = name
+    return wrapper
+
+
+for _name in ("__setitem__", "__delitem__", "__ior__", "update", "pop", "popitem", "setdefault", "clear"):
+    setattr(Dotdict, _name, _write_through(dict, _name))
+for _name in ("__setitem__", "__delitem__", "__iadd__", "__imul__", "append", "extend", "insert", "pop", "remove",
+              "clear", "sort", "reverse"):
+    setattr(DotList, _name, _write_through(list, _name))
+del _name
+
+
+def _view(owner, key, raw):
+    views = getattr(owner, "_views", None)
+    if views is None:
+        views = {}
+        object.__setattr__(owner, "_views", views)
+
+    cached = views.get(key)
+    if cached is not None and cached[0] is raw:
+        return cached[1]
+
+    view = Dotdict(raw) if type(raw) is dict else DotList(raw)
+    object.__setattr__(view, "_raw", raw)
+    views[key] = (raw, view)
+    return view
@@ -0,0 +1,141 @@
+import base64
+import binascii
+import hashlib
+import json
+import os
+import socket
+import time
+from contextlib import contextmanager, suppress
+from typing import NamedTuple
+
+from src import consts
+from src.utils.logger_utils import logger
+
+
+class Account(NamedTuple):
+    user: str
+    password: str
+
+
+class AccountPoolExhausted(RuntimeError):
+    pass
+
+
+def decode_password(password):
+    with suppress(binascii.Error, UnicodeDecodeError):
+        return base64.b64decode(password, validate=True).decode()
+    return password
+
+
+def accounts_from_config(entry, default_password):
+    """Accounts of a `user_<account>` config entry: a single user, a list of users, or a list of {user, password}."""
+    accounts = []
+    for item in entry if isinstance(entry, list) else [entry]:
+        if isinstance(item, dict):
+            accounts.append(Account(str(item["user"]), decode_password(item["password"]) if "password" in item else default_password))
+        else:
+            accounts.append(Account(str(item), default_password))
+    return accounts
+
+
+def _pid_alive(pid):
+    if os.name == "nt":  # no cheap check, rely on the lease timeout
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class AccountPool:
+    """Hand out trading accounts exclusively across xdist workers, matrix runs and virtual users.
+
+    A lease is a lock file created with O_EXCL under `lease_dir`. A lease left by a dead process on this host, or not
+    renewed for `lease_timeout` seconds, is considered stale and taken over.
+    """
+
+    def __init__(self, accounts, namespace, lease_dir=consts.LEASE_DIR, lease_timeout=1800.0, wait=300.0, poll=0.5):
+        self.accounts = list(accounts)
+        self.namespace = namespace
+        self.lease_dir = lease_dir
+        self.lease_timeout = lease_timeout
+        self.wait = wait
+        self.poll = poll
+        self._leased = {}  # account -> lock file path, leases held by this process
+
+    def __len__(self):
+        return len(self.accounts)
+
+    def _lock_path(self, account):
+        digest = hashlib.sha1(f"{self.namespace}|{account.user}".encode()).hexdigest()[:16]
+        return self.lease_dir / f"{digest}.lock"
+
+    def _is_stale(self, path):
+        try:
+            if time.time() - path.stat().st_mtime > self.lease_timeout:
+                return True
+            with open(path, "r", encoding="utf8") as _f:
+                owner = json.load(_f)
+        except FileNotFoundError:
+            return True
+        except (OSError, ValueError):
+            return False  # being written by its owner
+        return owner.get("host") == socket.gethostname() and not _pid_alive(owner.get("pid", 0))
+
+    def _try_lease(self, account, owner):
+        path = self._lock_path(account)
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            if not self._is_stale(path):
+                return False
+            logger.debug(f"Taking over stale lease of account {account.user}")
+            with suppress(FileNotFoundError):
+                os.remove(path)
+            return self._try_lease(account, owner)
+
+        with os.fdopen(fd, "w", encoding="utf8") as _f:
+            json.dump(dict(user=account.user, owner=owner, pid=os.getpid(), host=socket.gethostname(), leased_at=time.time()), _f)
+        self._leased[account] = path
+        return True
+
+    def acquire(self, owner=None, wait=None):
+        """Lease a free account, waiting up to `wait` seconds (default: pool setting) for one to be released."""
+        self.lease_dir.mkdir(parents=True, exist_ok=True)
+        owner = owner or f"pid-{os.getpid()}"
+        deadline = time.monotonic() + (self.wait if wait is None else wait)
+
+        while True:
+            for account in self.accounts:
+                if account not in self._leased and self._try_lease(account, owner):
+                    logger.debug(f"Account {account.user} leased by {owner}")
+                    return account
+            if time.monotonic() >= deadline:
+                raise AccountPoolExhausted(f"No free account out of {len(self.accounts)} for {self.namespace}")
+            time.sleep(self.poll)
+
+    def renew(self):
+        # heartbeat, keeps leases of a long session from being taken over as stale
+        for path in self._leased.values():
+            with suppress(FileNotFoundError):
+                os.utime(path)
+
+    def release(self, account):
+        if path := self._leased.pop(account, None):
+            with suppress(FileNotFoundError):
+                os.remove(path)
+
+    def release_all(self):
+        for account in list(self._leased):
+            self.release(account)
+
+    @contextmanager
+    def lease(self, owner=None, wait=None):
+        account = self.acquire(owner, wait)
+        try:
+            yield account
+        finally:
+            self.release(account)
@@ -0,0 +1,107 @@
+import itertools
+import threading
+from collections import Counter
+from dataclasses import dataclass, field
+
+from src.utils.histogram_utils import LatencyHistogram
+
+ORDER_ACCEPTED = "SUCCESS"
+
+
+def build_orders(symbol, count, order_type="BUY", volume=0.01, price=None, price_step=0.0, **fields):
+    """`count` orders of one template, limit prices laddered by `price_step` so they don't collapse into one level."""
+    template = dict(symbol=symbol, type=order_type, volume=volume, **fields)
+    if price is None:
+        return [template.copy() for _ in range(count)]
+    return [template | dict(price=round(price + i * price_step, 10)) for i in range(count)]
+
+
+def batched(orders, size):
+    """Split `orders` into batches of at most `size` orders."""
+    iterator = iter(orders)
+    return [list(batch) for batch in iter(lambda: tuple(itertools.islice(iterator, size)), ())]
+
+
+def _results(resp):
+    # XResponse.json() is {} for a body that isn't json, any other non-object body has no result either
+    body = resp.json()
+    return body.get("result") if isinstance(body, dict) else None
+
+
+def failure_reasons(resp, batch_size):
+    """Rejected orders of one bulk response by reason, the whole batch counts as failed when the request did."""
+    if resp is None:
+        return Counter({"connection error": batch_size})
+    if resp.status_code >= 400:
+        return Counter({f"HTTP {resp.status_code}": batch_size})
+
+    results = _results(resp)
+    if not isinstance(results, list):
+        return Counter()
+    return Counter(
+        item.get("message") or item.get("status") or "unknown"
+        for item in results if isinstance(item, dict) and item.get("status") != ORDER_ACCEPTED
+    )
+
+
+def accepted_order_ids(resp):
+    """Ids of the orders a bulk response accepted."""
+    results = _results(resp) if resp is not None else None
+    if not isinstance(results, list):
+        return []
+    return [item["orderId"] for item in results if isinstance(item, dict) and item.get("status") == ORDER_ACCEPTED and "orderId" in item]
+
+
+@dataclass
+class BulkEndpointStats:
+    batches: int = 0
+    orders: int = 0
+    rejected: int = 0
+    elapsed: float = 0.0  # wall time of the submission runs, used for orders/s
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+    failures: Counter = field(default_factory=Counter)
+
+    @property
+    def accepted(self):
+        return self.orders - self.rejected
+
+    @property
+    def orders_per_second(self):
+        return self.accepted / self.elapsed if self.elapsed else 0.0
+
+
+class BulkStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.endpoints: dict[str, BulkEndpointStats] = {}
+
+    def _get(self, endpoint):
+        return self.endpoints.setdefault(endpoint, BulkEndpointStats())
+
+    def record_batch(self, endpoint, batch_size, resp, seconds):
+        reasons = failure_reasons(resp, batch_size)
+        with self._lock:
+            stats = self._get(endpoint)
+            stats.batches += 1
+            stats.orders += batch_size
+            stats.rejected += min(sum(reasons.values()), batch_size)
+            stats.latency.record(seconds)
+            stats.failures.update(reasons)
+
+    def record_run(self, endpoint, seconds):
+        with self._lock:
+            self._get(endpoint).elapsed += seconds
+
+    def format_summary(self):
+        lines = []
+        for endpoint, stats in sorted(self.endpoints.items()):
+            lines.append(
+                f"{endpoint} | batches: {stats.batches} | orders: {stats.orders} | rejected: {stats.rejected} | "
+                f"{stats.orders_per_second:.1f} orders/s | batch p50: {stats.latency.percentile(50) * 1000:.0f}ms | "
+                f"p95: {stats.latency.percentile(95) * 1000:.0f}ms | max: {stats.latency.max * 1000:.0f}ms"
+            )
+            lines += [f"    {count} x {reason}" for reason, count in stats.failures.most_common()]
+        return "\n".join(lines)
+
+
+bulk_stats = BulkStats()
@@ -0,0 +1,163 @@
+import datetime
+import json
+import os
+import threading
+from collections import defaultdict
+from pathlib import Path
+from urllib.parse import urlsplit, parse_qsl, urlencode
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from src.utils.file_utils import worker_path, worker_files
+from src.utils.traffic_log import current_nodeid
+
+SCRUBBED = "***"
+
+
+class CassetteMissError(AssertionError):
+    pass
+
+
+class Cassette:
+    """Record request/response pairs to a jsonl cassette and serve them back without touching the network.
+
+    Requests are matched on method, path, sorted query and normalized (scrubbed, key-sorted) json body, the host is
+    ignored so a cassette recorded on one tenant url can be replayed against another. Repeated identical requests are
+    served in recorded order, the last recorded response keeps being served after that (polling loops). The order is
+    kept per test, a test replayed on another xdist worker than the one it was recorded on gets its own responses.
+    """
+
+    def __init__(self):
+        self.path = None
+        self.mode = None  # "record" | "replay"
+        self.strict = False
+        self.scrub_headers = set()
+        self.scrub_fields = set()
+        self._index = defaultdict(list)
+        self._node_index = defaultdict(list)
+        self._served = defaultdict(int)
+        self._file = None
+        self._lock = threading.Lock()
+
+    @property
+    def recording(self):
+        return self.mode == "record"
+
+    @property
+    def replaying(self):
+        return self.mode == "replay"
+
+    def open(self, path, mode, *, strict=False, scrub_headers=(), scrub_fields=()):
+        self.path = Path(path)
+        self.mode = mode
+        self.strict = strict
+        self.scrub_headers = {header.lower() for header in scrub_headers}
+        self.scrub_fields = {field.lower() for field in scrub_fields}
+
+        if self.recording:
+            if not os.environ.get("PYTEST_XDIST_WORKER"):  # a new recording, drop the last run's worker files
+                for file in worker_files(self.path):
+                    file.unlink()
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = worker_path(self.path).open("w", encoding="utf8")
+        else:
+            self._load()
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+        self.mode = None
+
+    def _load(self):
+        # an xdist recording is split into one file per worker, merged back here
+        files = worker_files(self.path)
+        if self.path.exists() or not files:
+            files.insert(0, self.path)
+        for file in files:
+            with file.open("r", encoding="utf8") as _f:
+                for line in _f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._index[entry["key"]].append(entry)
+                        self._node_index[entry.get("node"), entry["key"]].append(entry)
+
+    ### matching ###
+    def _scrub(self, data):
+        if isinstance(data, dict):
+            return {key: SCRUBBED if key.lower() in self.scrub_fields else self._scrub(value) for key, value in data.items()}
+        if isinstance(data, list):
+            return [self._scrub(value) for value in data]
+        return data
+
+    def _scrub_headers(self, headers):
+        return {key: SCRUBBED if key.lower() in self.scrub_headers else value for key, value in headers.items()}
+
+    def _normalize_body(self, body):
+        if not body:
+            return ""
+        if isinstance(body, bytes):
+            body = body.decode("utf8", errors="replace")
+        try:
+            return json.dumps(self._scrub(json.loads(body)), sort_keys=True, separators=(",", ":"))
+        except (TypeError, ValueError):
+            return body
+
+    def match_key(self, prepared: requests.PreparedRequest):
+        url = urlsplit(prepared.url)
+        query = urlencode(sorted(parse_qsl(url.query, keep_blank_values=True)))
+        return f"{prepared.method.upper()} {url.path}?{query} {self._normalize_body(prepared.body)}"
+
+    ### record ###
+    def record(self, resp: requests.Response):
+        request = resp.request
+        url = urlsplit(request.url)
+        entry = dict(
+            key=self.match_key(request),
+            node=current_nodeid(),
+            method=request.method,
+            url=f"{url.path}?{url.query}" if url.query else url.path,
+            request=dict(headers=self._scrub_headers(request.headers), body=self._normalize_body(request.body)),
+            status=resp.status_code,
+            reason=resp.reason,
+            headers=self._scrub_headers(resp.headers),
+            body=self._normalize_body(resp.content) if self.scrub_fields else resp.text,
+            elapsed=resp.elapsed.total_seconds(),
+        )
+        line = json.dumps(entry, ensure_ascii=False)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    ### replay ###
+    def play(self, session, method, url, params=None, data=None, headers=None, json=None, **kwargs):  # noqa
+        prepared = session.prepare_request(requests.Request(method, url, params=params, data=data, headers=headers, json=json))
+        key = self.match_key(prepared)
+
+        with self._lock:
+            served = current_nodeid(), key
+            entries = self._node_index.get(served)
+            if not entries:  # recorded by another test (session fixtures), fall back to the run order
+                served = key
+                entries = self._index.get(key)
+            if not entries:
+                if self.strict:
+                    raise CassetteMissError(f"No recorded response for {key!r} in {self.path}")
+                return None
+            entry = entries[min(self._served[served], len(entries) - 1)]
+            self._served[served] += 1
+
+        resp = requests.Response()
+        resp.status_code = entry["status"]
+        resp.reason = entry.get("reason")
+        resp.headers = CaseInsensitiveDict(entry["headers"])
+        resp._content = entry["body"].encode("utf8")
+        resp.encoding = "utf8"
+        resp.url = prepared.url
+        resp.request = prepared
+        resp.elapsed = datetime.timedelta(seconds=entry["elapsed"])
+        return resp
+
+
+cassette = Cassette()
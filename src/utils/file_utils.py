@@ -0,0 +1,69 @@
+import json
+import os
+import re
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+if os.name == "nt":
+    import msvcrt
+else:
+    import fcntl
+
+
+@contextmanager
+def file_lock(path: Path):
+    """Exclusive inter-process lock (xdist workers, matrix runs) held on `path`."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a+") as _lock:
+        if os.name == "nt":
+            msvcrt.locking(_lock.fileno(), msvcrt.LK_LOCK, 1)
+        else:
+            fcntl.flock(_lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if os.name == "nt":
+                msvcrt.locking(_lock.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(_lock, fcntl.LOCK_UN)
+
+
+def read_json(path: Path, default=None):
+    try:
+        with open(path, "r", encoding="utf8") as _f:
+            return json.load(_f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return default
+
+
+def write_json_atomic(path: Path, data, **kwargs):
+    # write to a temp file in the same directory then rename, readers never see a partial file
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf8") as _f:
+            json.dump(data, _f, **kwargs)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def worker_path(path: Path):
+    """`path` suffixed with the xdist worker id (`cassette.gw0.jsonl`), so workers never share a file."""
+    path = Path(path)
+    if worker := os.environ.get("PYTEST_XDIST_WORKER"):
+        return path.with_name(f"{path.stem}.{worker}{path.suffix}")
+    return path
+
+
+def worker_files(path: Path):
+    """Files written next to `path` through `worker_path`, in worker order."""
+    path = Path(path)
+    pattern = re.compile(rf"{re.escape(path.stem)}\.gw(\d+){re.escape(path.suffix)}")
+    matches = (pattern.fullmatch(file.name) for file in path.parent.glob(f"{path.stem}.gw*{path.suffix}"))
+    return [path.with_name(match[0]) for match in sorted(filter(None, matches), key=lambda match: int(match[1]))]
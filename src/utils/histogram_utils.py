@@ -0,0 +1,139 @@
+import math
+import re
+import threading
+from urllib.parse import urlsplit
+
+_ID_SEGMENT = re.compile(r"^(\d+|[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}|[0-9a-fA-F]{24,})$")
+
+
+def normalize_path(path_url: str) -> str:
+    # '/api/order/v1/123?symbol=X' -> '/api/order/v1/{id}'
+    path = urlsplit(path_url).path
+    return "/".join("{id}" if _ID_SEGMENT.match(segment) else segment for segment in path.split("/"))
+
+
+class LatencyHistogram:
+    """Streaming log-bucketed histogram, samples are counted in buckets with `precision` relative width.
+
+    Memory is bounded by the number of buckets (a few hundred between 1ms and 1h), not by the number of samples.
+    """
+
+    def __init__(self, precision=0.01):
+        self.precision = precision
+        self._log_gamma = math.log1p(2 * precision)
+        self._gamma = 1 + 2 * precision
+        self.buckets: dict[int, int] = {}
+        self.zeros = 0
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, value):
+        if value > 0:
+            index = math.ceil(math.log(value) / self._log_gamma)
+            self.buckets[index] = self.buckets.get(index, 0) + 1
+        else:
+            self.zeros += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def percentile(self, pct):
+        if not self.count:
+            return 0.0
+
+        rank = max(math.ceil(pct / 100 * self.count), 1)
+        if rank >= self.count:  # the largest sample is known exactly
+            return self.max
+        seen = self.zeros
+        if seen >= rank:
+            return 0.0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                # bucket midpoint, capped by the real max
+                return min(2 * self._gamma ** index / (self._gamma + 1), self.max)
+        return self.max
+
+    def merge(self, other):
+        """Add the samples of `other` (e.g. another worker's histogram), bucket counts only add up at the same precision."""
+        if other.precision != self.precision:
+            raise ValueError(f"Cannot merge histograms of precision {other.precision} into {self.precision}")
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.zeros += other.zeros
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+        return self
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def count_above(self, value):
+        """Samples greater than `value`, to the bucket precision."""
+        if value < 0:
+            return self.count
+        if value == 0:
+            return self.count - self.zeros
+        index = math.ceil(math.log(value) / self._log_gamma)
+        return sum(count for bucket, count in self.buckets.items() if bucket > index)
+
+    def to_dict(self):
+        return dict(precision=self.precision, buckets={str(k): v for k, v in self.buckets.items()}, zeros=self.zeros,
+                    count=self.count, total=self.total, max=self.max)
+
+    @classmethod
+    def from_dict(cls, data):
+        histogram = cls(data["precision"])
+        histogram.buckets = {int(k): v for k, v in data["buckets"].items()}
+        histogram.zeros = data["zeros"]
+        histogram.count = data["count"]
+        histogram.total = data["total"]
+        histogram.max = data["max"]
+        return histogram
+
+
+class LatencyRecorder:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.histograms: dict[str, LatencyHistogram] = {}
+
+    def record(self, method, path_url, seconds):
+        key = f"{method.upper()} {normalize_path(path_url)}"
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = LatencyHistogram()
+            histogram.record(seconds)
+
+    def merge(self, histograms: dict[str, LatencyHistogram]):
+        """Add histograms recorded elsewhere (an xdist worker) to the ones recorded here, by endpoint."""
+        with self._lock:
+            for key, histogram in histograms.items():
+                if (current := self.histograms.get(key)) is None:
+                    self.histograms[key] = histogram
+                else:
+                    current.merge(histogram)
+
+    def summary(self, percentiles=(50, 95, 99)):
+        rows = []
+        for endpoint, histogram in sorted(self.histograms.items()):
+            row = dict(endpoint=endpoint, count=histogram.count)
+            row |= {f"p{pct}": histogram.percentile(pct) for pct in percentiles}
+            row["max"] = histogram.max
+            rows.append(row)
+        return rows
+
+    def format_summary(self):
+        lines = []
+        for row in self.summary():
+            lines.append(
+                f"{row['endpoint']} | count: {row['count']} | p50: {row['p50'] * 1000:.0f}ms | p95: {row['p95'] * 1000:.0f}ms"
+                f" | p99: {row['p99'] * 1000:.0f}ms | max: {row['max'] * 1000:.0f}ms"
+            )
+        return "\n".join(lines)
+
+
+latency_recorder = LatencyRecorder()
@@ -1,3 +1,4 @@
+import functools
 import json
 import re
 
@@ -17,6 +18,7 @@ def truncate_json(data: dict | str, lines: int = 8) -> str:
         return "\n".join(split_lines[:lines]) + f"\n{first_key_indent}...\n" + "}"
     return formatted
 
+
 def extract_json_objects(s: str):
     objs = []
     depth = 0
@@ -30,4 +32,83 @@ def extract_json_objects(s: str):
             depth -= 1
             if depth == 0 and start is not None:
                 objs.append(s[start:i+1])
-    return objs
\ No newline at end of file
+    return objs
+
+
+def mask_json(data, keys: re.Pattern, mask="***"):
+    """Copy of `data` where the scalar values under keys matching `keys` are replaced by `mask`."""
+    if isinstance(data, dict):
+        return {
+            key: mask if keys.search(str(key)) and not isinstance(value, (dict, list)) else mask_json(value, keys, mask)
+            for key, value in data.items()
+        }
+    if isinstance(data, list):
+        return [mask_json(value, keys, mask) for value in data]
+    return data
+
+
+WILDCARD = "*"
+_MATCHES = object()  # trie slot holding the keys ending at a node
+
+
+class KeyPath:
+    """Pre-split key path ('result.user.metatraderId', 'result[0].symbol'), resolved in O(depth)."""
+    __slots__ = ("key", "parts")
+
+    def __init__(self, key: str):
+        self.key = key
+        self.parts = tuple(int(x) if x.isdigit() else x for x in filter(None, re.split(r'[\[.\]]', key)))
+
+    @property
+    def has_wildcard(self):
+        return WILDCARD in self.parts
+
+    def resolve(self, data):
+        # raise KeyError/IndexError/TypeError when the path does not exist in data
+        for part in self.parts:
+            data = data[part]
+        return data
+
+    def __repr__(self):
+        return f"KeyPath({self.key!r})"
+
+
+@functools.lru_cache(maxsize=1024)
+def compile_key_path(key: str) -> KeyPath:
+    return KeyPath(key)
+
+
+def resolve_many(data, keys):
+    """Resolve several key paths in one traversal of `data`, '*' matches every item of a list/dict.
+
+    Paths sharing a prefix ('result[*].symbol', 'result[*].volume') share the walk, each node is visited once.
+    Returns {key: [(concrete_key, value), ...]}, the list is empty when the path does not exist.
+    """
+    trie = {}
+    for key in keys:
+        node = trie
+        for part in compile_key_path(key).parts:
+            node = node.setdefault(part, {})
+        node.setdefault(_MATCHES, []).append(key)
+
+    results = {key: [] for key in keys}
+
+    def walk(value, node, prefix):
+        for key in node.get(_MATCHES, ()):
+            results[key].append((prefix, value))
+
+        for part, child in node.items():
+            if part is _MATCHES:
+                continue
+            if part == WILDCARD:
+                items = enumerate(value) if isinstance(value, list) else value.items() if isinstance(value, dict) else ()
+            else:
+                try:
+                    items = ((part, value[part]),)
+                except (KeyError, IndexError, TypeError):
+                    continue
+            for sub, sub_value in items:
+                walk(sub_value, child, f"{prefix}[{sub}]" if isinstance(sub, int) else f"{prefix}.{sub}" if prefix else sub)
+
+    walk(data, trie, "")
+    return results
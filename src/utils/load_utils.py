@@ -0,0 +1,142 @@
+import asyncio
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from urllib.parse import urlsplit
+
+from pytest_check import check_log
+
+from src.core.request import user_headers
+from src.utils.account_pool import AccountPoolExhausted
+from src.utils.logger_utils import logger
+
+
+@dataclass
+class EndpointStats:
+    requests: int = 0
+    errors: int = 0
+    elapsed: float = 0.0  # wall time of the load runs that hit this endpoint, used for throughput
+
+
+class LoadStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.active = False
+        self.endpoints: dict[str, EndpointStats] = {}
+        self.iterations = 0
+        self.failures = 0
+        self.elapsed = 0.0  # wall time spent under load
+        self._hit = set()  # endpoints hit by the running load run
+
+    def start(self):
+        with self._lock:
+            self.active = True
+            self._hit = set()
+
+    def stop(self, elapsed):
+        with self._lock:
+            self.active = False
+            self.elapsed += elapsed
+            for key in self._hit:
+                self.endpoints[key].elapsed += elapsed
+
+    def record(self, method, url, status_code=None):
+        key = f"{method.upper()} {urlsplit(url).path}"
+        with self._lock:
+            stats = self.endpoints.setdefault(key, EndpointStats())
+            self._hit.add(key)
+            stats.requests += 1
+            if status_code is None or status_code >= 400:
+                stats.errors += 1
+
+    def record_iteration(self, passed):
+        with self._lock:
+            self.iterations += 1
+            self.failures += not passed
+
+    def report(self):
+        rows = []
+        for endpoint, stats in sorted(self.endpoints.items()):
+            rows.append(dict(
+                endpoint=endpoint,
+                requests=stats.requests,
+                errors=stats.errors,
+                error_rate=stats.errors / stats.requests * 100,
+                throughput=stats.requests / stats.elapsed if stats.elapsed else 0.0,
+            ))
+        return rows
+
+
+load_stats = LoadStats()
+
+
+def run_virtual_users(func, kwargs, *, authenticate, users, ramp_up=0.0, duration=60.0, think_time=0.0, accounts=None):
+    """Replay `func(**kwargs)` with `users` concurrent virtual users, each one logged in with its own headers.
+
+    With an `accounts` pool every user leases its own account, `authenticate(account)` is called with it, or with None
+    once the pool is exhausted and the user shares the session account.
+
+    Users are started evenly over `ramp_up` seconds, then all of them loop until `ramp_up + duration` is reached,
+    sleeping `think_time` (+/- 50%) between iterations. An iteration fails when it raises or a soft assert in it fails.
+    An event loop in `kwargs` (async_loop) is replaced by one loop per user, a loop can't run on several threads.
+    Returns the first error raised by an iteration, if any.
+    """
+    start = time.monotonic()
+    stop_at = start + ramp_up + duration
+    iterations = [0] * users  # one slot per user, no lock needed
+    failed = [0] * users
+    errors = []
+
+    def lease(index):
+        if accounts is None:
+            return None
+        try:
+            return accounts.acquire(owner=f"vuser-{index}", wait=0)
+        except AccountPoolExhausted:
+            logger.warning(f"Virtual user {index} shares the session account, no free account left")
+            return None
+
+    def virtual_user(index):
+        time.sleep(index * ramp_up / users)
+        account = lease(index)
+        loop = None
+        user_kwargs = dict(kwargs)
+        for name, value in kwargs.items():
+            if isinstance(value, asyncio.AbstractEventLoop):
+                loop = loop or asyncio.new_event_loop()
+                user_kwargs[name] = loop
+        try:
+            with user_headers(authenticate(account)):
+                while time.monotonic() < stop_at:
+                    soft_failures = check_log.get_num_failures()  # this thread's own soft assert failures
+                    try:
+                        func(**user_kwargs)
+                        passed = check_log.get_num_failures() == soft_failures
+                    except Exception as error:  # noqa
+                        passed = False
+                        errors.append(error)
+                    load_stats.record_iteration(passed)
+                    failed[index] += not passed
+                    iterations[index] += 1
+
+                    if think_time:
+                        time.sleep(think_time * random.uniform(0.5, 1.5))
+        finally:
+            if account:
+                accounts.release(account)
+            if loop:
+                loop.run_until_complete(loop.shutdown_asyncgens())
+                loop.close()
+
+    load_stats.start()
+    try:
+        with ThreadPoolExecutor(max_workers=users, thread_name_prefix="vuser") as executor:
+            for future in [executor.submit(virtual_user, index) for index in range(users)]:
+                future.result()
+    finally:
+        load_stats.stop(time.monotonic() - start)
+
+    logger.info(f"Load run finished: {users} users, {sum(iterations)} iterations, {sum(failed)} failed")
+    return errors[0] if errors else None
@@ -39,3 +39,18 @@ def setup_logging(
     formatter = ColoredFormatter(log_format, datefmt=date_format)
     stream.setFormatter(formatter)
     logger.addHandler(stream)
+
+
+class LazyFormat:
+    """Defer building an expensive log message until a handler actually emits the record.
+
+    usage: logger.debug("%s", LazyFormat(format_request_response, resp))
+    """
+    __slots__ = ("_func", "_args")
+
+    def __init__(self, func, *args):
+        self._func = func
+        self._args = args
+
+    def __str__(self):
+        return str(self._func(*self._args))
@@ -0,0 +1,96 @@
+import itertools
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+# set in the environment of every combination run, a run carrying it never spawns a matrix itself
+MATRIX_ENV = "PYTEST_MATRIX_COMBINATION"
+
+MATRIX_OPTIONS = ("--client", "--server", "--account", "--matrix-workers")
+MATRIX_FLAGS = ("--matrix", "--clean-alluredir")  # --clean-alluredir is applied once by the matrix run
+PER_COMBINATION_PATHS = ("--record", "--replay", "--traffic-log")  # one file per combination
+
+_print_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class Combination:
+    client: str
+    server: str
+    account: str
+
+    @property
+    def name(self):
+        return f"{self.client}-{self.server}-{self.account}"
+
+    def args(self):
+        return ["--client", self.client, "--server", self.server, "--account", self.account]
+
+
+@dataclass
+class CombinationResult:
+    combination: Combination
+    returncode: int
+    duration: float
+
+
+def split_values(value):
+    return [item.strip() for item in str(value).split(",") if item.strip()]
+
+
+def build_matrix(clients, servers, accounts, config):
+    """Every client x server x account combination, split into the ones with configured credentials and the rest."""
+    valid, skipped = [], []
+    for client, server, account in itertools.product(split_values(clients), split_values(servers), split_values(accounts)):
+        combination = Combination(client, server, account)
+        credentials = ((config.get(client) or {}).get("credentials") or {}).get(server) or {}
+        if f"user_{account}" in credentials:
+            valid.append(combination)
+        else:
+            skipped.append(combination)
+    return valid, skipped
+
+
+def combination_args(args, combination):
+    """Invocation args of the matrix run rewritten for one combination."""
+    result = []
+    args = iter(args)
+    for arg in args:
+        name, has_value, value = arg.partition("=")
+        if name in MATRIX_FLAGS:
+            continue
+        if name in MATRIX_OPTIONS:
+            if not has_value:
+                next(args, None)
+            continue
+        if name in PER_COMBINATION_PATHS:
+            path = Path(value if has_value else next(args))
+            result += [name, str(path.with_name(f"{path.stem}.{combination.name}{path.suffix}"))]
+            continue
+        result.append(arg)
+    return result + combination.args()
+
+
+def run_matrix(args, combinations, workers=0):
+    """Run one pytest subprocess per combination, `workers` at a time (all at once by default), output prefixed."""
+
+    def run(combination):
+        env = os.environ | {MATRIX_ENV: combination.name}
+        start = time.monotonic()
+        with subprocess.Popen(
+            [sys.executable, "-m", "pytest", *combination_args(args, combination)],
+            stdout=subprocess.PIPE, stderr=subprocess.STDOUT, env=env, text=True, encoding="utf8", errors="replace",
+        ) as proc:
+            for line in proc.stdout:
+                with _print_lock:
+                    sys.stdout.write(f"[{combination.name}] {line}")
+                    sys.stdout.flush()
+        return CombinationResult(combination, proc.returncode, time.monotonic() - start)
+
+    with ThreadPoolExecutor(max_workers=workers or len(combinations), thread_name_prefix="matrix") as executor:
+        return list(executor.map(run, combinations))
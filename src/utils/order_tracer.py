@@ -0,0 +1,190 @@
+import asyncio
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import Counter
+from dataclasses import dataclass, field
+
+from src.core.async_request import gather
+from src.utils.histogram_utils import LatencyHistogram
+from src.utils.logger_utils import logger
+from src.utils.wait_utils import iter_intervals
+
+PENDING_ORDER_TYPES = ("BUY_LIMIT", "SELL_LIMIT", "BUY_STOP", "SELL_STOP")
+
+
+def _result(resp):
+    if resp is None or resp.status_code != 200:
+        return None
+    try:
+        body = resp.json()
+    except ValueError:
+        return None
+    return body.get("result") if isinstance(body, dict) else None
+
+
+def _pending_count(result):
+    return result.get("pending", 0) if isinstance(result, dict) else 0
+
+
+def _has_order(rows, order_id):
+    return isinstance(rows, list) and any(isinstance(row, dict) and row.get("orderId") == order_id for row in rows)
+
+
+### probes ###
+class Probe(ABC):
+    """One read endpoint an order should propagate to, `seen` is polled until it returns True."""
+    name = None
+
+    async def baseline(self, client, order):  # noqa
+        return None
+
+    @abstractmethod
+    async def seen(self, client, order, order_id, baseline):
+        ...
+
+
+class PendingProbe(Probe):
+    name = "pending"
+
+    async def seen(self, client, order, order_id, baseline):
+        return _has_order(_result(await client.pending.get(dict(symbol=order["symbol"]), attach=False)), order_id)
+
+
+class PendingDetailsProbe(Probe):
+    name = "pending_details"
+
+    async def seen(self, client, order, order_id, baseline):
+        return bool(_result(await client.pending_details.get(order_id, attach=False)))
+
+
+class CountsProbe(Probe):
+    """Pending count above the count read before placement, only attributable to one order when traced alone."""
+    name = "counts"
+
+    async def baseline(self, client, order):
+        return _pending_count(_result(await client.counts.get(attach=False)))
+
+    async def seen(self, client, order, order_id, baseline):
+        return _pending_count(_result(await client.counts.get(attach=False))) > baseline
+
+
+class DealHistoriesProbe(Probe):
+    name = "deal_histories"
+
+    async def seen(self, client, order, order_id, baseline):
+        return _has_order(_result(await client.deal_histories.get(dict(symbol=order["symbol"]), attach=False)), order_id)
+
+
+PENDING_PROBES = (PendingProbe(), PendingDetailsProbe(), CountsProbe())
+FILL_PROBES = (DealHistoriesProbe(),)
+
+
+### stats ###
+@dataclass
+class OrderTrace:
+    order: dict
+    order_id: object = None
+    stages: dict = field(default_factory=dict)  # stage -> seconds after the placement request was sent
+    missed: list = field(default_factory=list)
+
+
+class LifecycleStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stages: dict[str, LatencyHistogram] = {}
+        self.missed = Counter()
+
+    def record(self, trace: OrderTrace):
+        with self._lock:
+            for stage, seconds in trace.stages.items():
+                self.stages.setdefault(stage, LatencyHistogram()).record(seconds)
+            self.missed.update(trace.missed)
+
+    def median(self, stage):
+        with self._lock:
+            histogram = self.stages.get(stage)
+            return histogram.percentile(50) if histogram and histogram.count else None
+
+    def format_summary(self):
+        lines = []
+        for stage, histogram in sorted(self.stages.items(), key=lambda item: item[1].percentile(50)):
+            lines.append(
+                f"{stage} | orders: {histogram.count} | missed: {self.missed[stage]} | p50: {histogram.percentile(50) * 1000:.0f}ms"
+                f" | p95: {histogram.percentile(95) * 1000:.0f}ms | p99: {histogram.percentile(99) * 1000:.0f}ms"
+                f" | max: {histogram.max * 1000:.0f}ms"
+            )
+        lines += [f"{stage} | missed: {count}" for stage, count in self.missed.items() if stage not in self.stages]
+        return "\n".join(lines)
+
+
+lifecycle_stats = LifecycleStats()
+
+
+### tracer ###
+class OrderTracer:
+    """Place an order and time its propagation to the read endpoints: placement -> pending -> fill.
+
+    Every stage is polled concurrently, polls are not attached to the report. A poll waits `interval` seconds before the next one, starting at a quarter of
+    the stage median seen so far (`min_interval` without history) and growing by `backoff` up to `max_interval`, so a
+    stage is sampled densely where it usually lands. A stage is timed at the send time of the first poll seeing the
+    order, the error is bounded by the interval in use.
+    """
+
+    def __init__(self, client, probes=None, min_interval=0.02, max_interval=1.0, backoff=1.5, timeout=30.0, stats=None):
+        self.client = client  # AsyncTradeClient
+        self.probes = probes
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.timeout = timeout
+        self.stats = stats or lifecycle_stats
+
+    def probes_for(self, order):
+        if self.probes is not None:
+            return self.probes
+        return PENDING_PROBES if order.get("type") in PENDING_ORDER_TYPES else FILL_PROBES
+
+    async def _poll(self, probe, order, order_id, baseline, placed_at):
+        median = self.stats.median(probe.name)
+        initial = max(self.min_interval, median / 4) if median else self.min_interval
+        intervals = iter_intervals(initial, self.backoff, self.max_interval)
+        deadline = placed_at + self.timeout
+
+        while (sent := time.monotonic()) < deadline:
+            if await probe.seen(self.client, order, order_id, baseline):
+                return sent - placed_at
+            await asyncio.sleep(min(next(intervals), max(deadline - time.monotonic(), 0)))
+        return None
+
+    async def trace(self, order):
+        trace = OrderTrace(order)
+        probes = self.probes_for(order)
+        baselines = await asyncio.gather(*(probe.baseline(self.client, order) for probe in probes))
+
+        placed_at = time.monotonic()
+        resp = await self.client.trade.post(order)
+        trace.stages["placed"] = time.monotonic() - placed_at
+
+        result = _result(resp)
+        trace.order_id = result.get("orderId") if isinstance(result, dict) else None
+        if trace.order_id is None:
+            logger.warning(f"Order not placed, nothing to trace: {order}")
+            trace.missed.append("placed")
+            del trace.stages["placed"]
+        else:
+            seen = await asyncio.gather(*(
+                self._poll(probe, order, trace.order_id, baseline, placed_at) for probe, baseline in zip(probes, baselines)
+            ))
+            for probe, seconds in zip(probes, seen):
+                if seconds is None:
+                    trace.missed.append(probe.name)
+                else:
+                    trace.stages[probe.name] = seconds
+
+        self.stats.record(trace)
+        return trace
+
+    async def trace_many(self, orders, limit=None):
+        """Trace orders concurrently, at most `limit` orders in flight."""
+        return await gather(*(self.trace(order) for order in orders), limit=limit)
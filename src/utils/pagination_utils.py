@@ -0,0 +1,139 @@
+import contextvars
+import math
+from collections import deque
+
+from src.consts import PASSED_ICON, FAILED_ICON
+from src.core.async_request import get_executor
+from src.utils import Dotdict
+from src.utils.assert_utils import soft_assert
+from src.utils.logger_utils import logger
+from src.utils.schema_utils import iter_schema_errors, format_error_path
+
+LIST_KEYS = ("content", "items", "rows", "data", "list")
+
+
+def page_rows(body):
+    """Rows of a list page: `result` itself or the list nested under one of LIST_KEYS."""
+    result = body.get("result") if isinstance(body, dict) else None
+    if isinstance(result, list):
+        return result
+    if isinstance(result, dict):
+        for key in LIST_KEYS:
+            if isinstance(result.get(key), list):
+                return result[key]
+    return []
+
+
+def page_count(body, page_size):
+    """Total pages announced by a page, None when the endpoint doesn't tell."""
+    for holder in (body, body.get("result")) if isinstance(body, dict) else ():
+        if not isinstance(holder, dict):
+            continue
+        if isinstance(holder.get("totalPages"), int):
+            return holder["totalPages"]
+        for key in ("totalElements", "total"):
+            if isinstance(holder.get(key), int):
+                return math.ceil(holder[key] / page_size)
+    return None
+
+
+class SchemaCheck:
+    """Row hook validating every streamed row against `schema`, the outcome is logged once (soft assert) by `close`."""
+
+    def __init__(self, schema, max_logged=5):
+        self.schema = schema
+        self.max_logged = max_logged
+        self.rows = 0
+        self.invalid = 0
+
+    def __call__(self, index, row):
+        self.rows += 1
+        if errors := iter_schema_errors(row, self.schema):
+            self.invalid += 1
+            if self.invalid <= self.max_logged:
+                for error in errors:
+                    logger.warning(f"  Row {index} JSON schema validation failed: {error.message} [{format_error_path(error)}]")
+
+    def close(self):
+        msg = f"Verify JSON schema of {self.rows} streamed rows"
+        if self.invalid:
+            logger.warning(f"{FAILED_ICON} {msg} ({self.invalid} invalid)")
+            soft_assert(False, f"{msg}: {self.invalid} invalid")
+        else:
+            logger.info(f"{PASSED_ICON} {msg}")
+
+
+class PageIterator:
+    """Stream the rows of a paginated list endpoint without loading it whole.
+
+    `method(params, **kwargs)` is any route method returning an XResponse. While rows of the current page are
+    yielded, the next `prefetch` pages are requested concurrently on the shared request pool, so at most
+    `prefetch + 1` pages are held in memory. Iteration stops at the announced page count, or at the first short page.
+    Every row goes through `hooks` (callables taking `(index, row)`), a `schema` adds a SchemaCheck hook.
+    """
+
+    def __init__(self, method, params=None, *, page_size=100, prefetch=2, first_page=1, page_param="page",
+                 size_param="size", max_pages=None, schema=None, hooks=(), **kwargs):
+        self.method = method
+        self.params = dict(params or {})
+        self.page_size = page_size
+        self.prefetch = max(prefetch, 0)
+        self.first_page = first_page
+        self.page_param = page_param
+        self.size_param = size_param
+        self.max_pages = max_pages
+        self.hooks = list(hooks) + ([SchemaCheck(schema)] if schema else [])
+        self.kwargs = kwargs | dict(attach=kwargs.get("attach", False))
+        self.pages = 0
+        self.rows = 0
+
+    def _fetch(self, page):
+        params = self.params | {self.page_param: page, self.size_param: self.page_size}
+        ctx = contextvars.copy_context()  # keep the caller's user_headers in the worker thread
+        return get_executor().submit(ctx.run, self.method, params, **self.kwargs)
+
+    def __iter__(self):
+        last_page = self.first_page + self.max_pages - 1 if self.max_pages else None
+        window = deque()
+        next_page = self.first_page
+
+        def fill(size):
+            nonlocal next_page
+            while len(window) < size and (last_page is None or next_page <= last_page):
+                window.append((next_page, self._fetch(next_page)))
+                next_page += 1
+
+        try:
+            fill(self.prefetch + 1)  # nothing is being read yet
+            while window:
+                page, future = window.popleft()
+                if last_page is not None and page > last_page:  # prefetched before the page count was known
+                    break
+                resp = future.result()
+                if resp is None:  # connection error, already logged by XRequest
+                    break
+                body = resp.json()
+                rows = page_rows(body)
+                if (total := page_count(body, self.page_size)) is not None:
+                    announced = self.first_page + total - 1
+                    last_page = announced if last_page is None else min(last_page, announced)
+                del resp, body  # only the rows of this page stay referenced
+
+                self.pages += 1
+                fill(self.prefetch)  # the page being read and `prefetch` pages ahead
+                for row in rows:
+                    for hook in self.hooks:
+                        hook(self.rows, row)
+                    self.rows += 1
+                    yield Dotdict(row) if isinstance(row, dict) else row
+
+                if len(rows) < self.page_size:
+                    break
+                del rows
+                fill(1)  # with prefetch=0 the next page is only requested once this one is released
+        finally:
+            for _, future in window:
+                future.cancel()
+            for hook in self.hooks:
+                if close := getattr(hook, "close", None):
+                    close()
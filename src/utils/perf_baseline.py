@@ -0,0 +1,103 @@
+import datetime
+import math
+
+from src import consts
+from src.utils.file_utils import file_lock, read_json, write_json_atomic
+from src.utils.histogram_utils import LatencyHistogram
+
+OK = "ok"
+REGRESSION = "REGRESSION"
+NEW = "new"
+FEW_SAMPLES = "few samples"
+
+
+def sign_test_pvalue(exceeding, count):
+    """One-sided binomial sign test: P(X >= exceeding) for X ~ Binomial(count, 0.5)."""
+    if exceeding <= 0:
+        return 1.0
+    log_half = count * math.log(0.5)
+    log_terms = [
+        math.lgamma(count + 1) - math.lgamma(i + 1) - math.lgamma(count - i + 1) + log_half
+        for i in range(exceeding, count + 1)
+    ]
+    peak = max(log_terms)
+    return min(1.0, math.exp(peak) * sum(math.exp(term - peak) for term in log_terms))
+
+
+class PerfBaseline:
+    """Per-endpoint latency baselines, keyed by env/client/server/endpoint, stored in one json file.
+
+    Every `update` keeps the session histogram as the reference and appends its percentiles to the key history.
+    `compare` counts the session samples slower than the baseline median * (1 + tolerance): without a regression at
+    most half of them are expected above it, so a regression is only reported when the sign test rejects that at
+    `alpha`, a few slow outliers don't fail the run.
+    """
+
+    def __init__(self, path=consts.PERF_BASELINE_FILE, tolerance=0.2, alpha=0.01, min_samples=10, history=20):
+        self.path = path
+        self.lock_path = consts.CACHE_DIR / f"{path.name}.lock"
+        self.tolerance = tolerance
+        self.alpha = alpha
+        self.min_samples = min_samples
+        self.history = history
+
+    @staticmethod
+    def key(env, client, server, endpoint):
+        return f"{env}|{client}|{server}|{endpoint}"
+
+    def load(self):
+        return read_json(self.path, {})
+
+    def compare(self, histograms: dict[str, LatencyHistogram], env, client, server):
+        baselines = self.load()
+        rows = []
+        for endpoint, current in sorted(histograms.items()):
+            row = dict(endpoint=endpoint, count=current.count, p50=current.percentile(50), p95=current.percentile(95))
+            entry = baselines.get(self.key(env, client, server, endpoint))
+            if entry is None:
+                rows.append(row | dict(verdict=NEW))
+                continue
+
+            baseline = LatencyHistogram.from_dict(entry["histogram"])
+            threshold = baseline.percentile(50) * (1 + self.tolerance)
+            exceeding = current.count_above(threshold)
+            pvalue = sign_test_pvalue(exceeding, current.count)
+            row |= dict(
+                base_p50=baseline.percentile(50), base_p95=baseline.percentile(95), threshold=threshold,
+                exceeding=exceeding, pvalue=pvalue,
+            )
+            if current.count < self.min_samples:
+                row["verdict"] = FEW_SAMPLES
+            else:
+                row["verdict"] = REGRESSION if pvalue < self.alpha else OK
+            rows.append(row)
+        return rows
+
+    def update(self, histograms: dict[str, LatencyHistogram], env, client, server):
+        timestamp = datetime.datetime.now().isoformat(timespec="seconds")
+        with file_lock(self.lock_path):
+            baselines = self.load()
+            for endpoint, histogram in histograms.items():
+                if histogram.count < self.min_samples:
+                    continue
+                key = self.key(env, client, server, endpoint)
+                history = baselines.get(key, {}).get("history", [])
+                history.append(dict(
+                    timestamp=timestamp, count=histogram.count,
+                    **{f"p{pct}": round(histogram.percentile(pct), 6) for pct in (50, 90, 95, 99)},
+                ))
+                baselines[key] = dict(histogram=histogram.to_dict(), history=history[-self.history:])
+            write_json_atomic(self.path, baselines, indent=1, sort_keys=True)
+
+    @staticmethod
+    def format_report(rows):
+        lines = []
+        for row in rows:
+            line = f"{row['verdict']:<12}{row['endpoint']} | n: {row['count']} | p50: {row['p50'] * 1000:.0f}ms | p95: {row['p95'] * 1000:.0f}ms"
+            if "base_p50" in row:
+                line += (
+                    f" | baseline p50: {row['base_p50'] * 1000:.0f}ms p95: {row['base_p95'] * 1000:.0f}ms"
+                    f" | above {row['threshold'] * 1000:.0f}ms: {row['exceeding']}/{row['count']} (p={row['pvalue']:.3g})"
+                )
+            lines.append(line)
+        return "\n".join(lines)
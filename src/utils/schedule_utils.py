@@ -0,0 +1,102 @@
+import heapq
+import statistics
+import threading
+from collections import defaultdict
+
+from src import consts
+from src.utils.file_utils import file_lock, read_json, write_json_atomic
+
+DEFAULT_ESTIMATE = 1.0  # seconds, for a new test in a module without history
+
+
+def module_of(nodeid):
+    return nodeid.split("::", 1)[0]
+
+
+class DurationDB:
+    """Test durations (setup + call + teardown) smoothed over sessions, shared by xdist workers through a locked file.
+
+    A duration is an exponentially weighted average: `alpha` of the latest run, so one slow run doesn't reshuffle the
+    schedule.
+    """
+
+    def __init__(self, path=consts.DURATIONS_FILE, alpha=0.3):
+        self.path = path
+        self.lock_path = path.with_suffix(".lock")
+        self.alpha = alpha
+        self.durations: dict[str, float] = read_json(path, {})
+        self._session = defaultdict(float)
+        self._lock = threading.Lock()
+
+    def record(self, nodeid, seconds):
+        with self._lock:
+            self._session[nodeid] += seconds
+
+    def save(self):
+        if not self._session:
+            return
+        with file_lock(self.lock_path):
+            durations = read_json(self.path, {})
+            for nodeid, seconds in self._session.items():
+                previous = durations.get(nodeid)
+                durations[nodeid] = round(seconds if previous is None else self.alpha * seconds + (1 - self.alpha) * previous, 4)
+            write_json_atomic(self.path, durations, indent=0, sort_keys=True)
+        self.durations = durations
+        self._session.clear()
+
+    def estimate(self, nodeids):
+        """Known duration of each test, the mean of its module for new tests, the overall median without either."""
+        by_module = defaultdict(list)
+        for nodeid, seconds in self.durations.items():
+            by_module[module_of(nodeid)].append(seconds)
+        fallback = statistics.median(self.durations.values()) if self.durations else DEFAULT_ESTIMATE
+
+        estimates = {}
+        for nodeid in nodeids:
+            if nodeid in self.durations:
+                estimates[nodeid] = self.durations[nodeid]
+            elif known := by_module.get(module_of(nodeid)):
+                estimates[nodeid] = statistics.fmean(known)
+            else:
+                estimates[nodeid] = fallback
+        return estimates
+
+
+def lpt_order(costs: dict):
+    """Units by decreasing cost (longest processing time first), ties keep their name order so every worker agrees."""
+    return sorted(costs, key=lambda unit: (-costs[unit], unit))
+
+
+def _path(unit):
+    # 'tests/trade/market/test_bulk.py::test_x' -> ('tests', 'trade', 'market', 'test_bulk.py', 'test_x')
+    module, *names = unit.split("::")
+    return (*module.split("/"), *names)
+
+
+def lpt_tree_order(costs: dict):
+    """Units longest first within their module/package, and every package longest first within its parent.
+
+    A package (or module) runs as one block, so its package/module scoped fixtures are set up once.
+    """
+    totals = defaultdict(float)
+    for unit, cost in costs.items():
+        path = _path(unit)
+        for depth in range(1, len(path) + 1):
+            totals[path[:depth]] += cost
+
+    def key(unit):
+        path = _path(unit)
+        return tuple((-totals[path[:depth]], path[depth - 1]) for depth in range(1, len(path) + 1))
+
+    return sorted(costs, key=key)
+
+
+def lpt_assign(costs: dict, workers):
+    """Greedy LPT: each unit, longest first, goes to the least loaded worker. Returns unit -> worker index."""
+    heap = [(0.0, worker) for worker in range(workers)]
+    assignment = {}
+    for unit in lpt_order(costs):
+        load, worker = heapq.heappop(heap)
+        assignment[unit] = worker
+        heapq.heappush(heap, (load + costs[unit], worker))
+    return assignment
@@ -0,0 +1,37 @@
+import hashlib
+import json
+import threading
+
+import jsonschema
+
+_lock = threading.Lock()
+_validators = {}  # schema content hash -> compiled validator
+_by_id = {}  # id(schema) -> (schema, validator), skips hashing for schemas declared once on route classes
+
+
+def get_validator(schema):
+    """Return the compiled validator of `schema`, the meta-schema check and compilation happen once per content."""
+    cached = _by_id.get(id(schema))
+    if cached and cached[0] is schema:
+        return cached[1]
+
+    digest = hashlib.sha1(json.dumps(schema, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+    with _lock:
+        validator = _validators.get(digest)
+        if validator is None:
+            cls = jsonschema.validators.validator_for(schema)
+            cls.check_schema(schema)
+            validator = _validators[digest] = cls(schema)
+        if len(_by_id) >= 256:  # schemas rebuilt on every call would otherwise pile up here
+            _by_id.clear()
+        _by_id[id(schema)] = (schema, validator)
+    return validator
+
+
+def iter_schema_errors(instance, schema):
+    """All validation errors in one pass, ordered by their path in the instance."""
+    return sorted(get_validator(schema).iter_errors(instance), key=lambda e: [str(item) for item in e.absolute_path])
+
+
+def format_error_path(error):
+    return ".".join(str(item) for item in error.absolute_path)
@@ -0,0 +1,237 @@
+import base64
+import itertools
+import json
+import math
+import random
+import threading
+import time
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+from src.enums.system import AccountType
+from src.routes.auth.company_login import CompanyLogin
+
+
+def _fake_jwt(subject, ttl=3600):
+    def encode(data):
+        return base64.urlsafe_b64encode(json.dumps(data).encode()).decode().rstrip("=")
+
+    return f"{encode(dict(alg='none', typ='JWT'))}.{encode(dict(sub=str(subject), exp=int(time.time()) + ttl))}.stub"
+
+
+class StubServer:
+    """In-process stand-in for the Aquariux webtrader API.
+
+    Serves the endpoints the route clients know about with schema-compatible payloads. `latency` (+/- `jitter`)
+    seconds are slept before each response and list payloads are padded up to `payload_size` bytes, both can be
+    changed while the server is running. Orders placed one by one show up in the read endpoints `propagation`
+    seconds later: limit/stop orders as pending, market orders as deals. Deal histories start with `history`
+    generated deals and are paginated when `page` is passed.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, *, client="stub", account=AccountType.DEMO, latency=0.0, jitter=0.0,
+                 payload_size=0, propagation=0.0, history=0):
+        self.client = client
+        self.account = account
+        self.latency = latency
+        self.jitter = jitter
+        self.payload_size = payload_size
+        self.propagation = propagation
+        self.history = history  # synthetic past deals served by deal histories, before placed market orders
+        self.requests = 0
+        self.orders = {}  # orderId -> (order, visible at)
+
+        self.routes = {("POST", url): self.login for urls in CompanyLogin.url_map.values() for url in urls.values()}
+        self.routes |= {
+            ("GET", "/api/order/v1/pending"): self.pending,
+            ("GET", "/api/config/v1/company"): self.company,
+            ("POST", "/api/trade/v1/order"): self.order,
+            ("DELETE", "/api/trade/v1/order"): self.cancel,
+            ("GET", "/api/order/v1/pending-details"): self.pending_details,
+            ("GET", "/api/order/v1/deal-histories"): self.deal_histories,
+            ("GET", "/api/order/v1/counts"): self.counts,
+            ("POST", "/api/trade/v1/order/bulk"): self.bulk,
+            ("POST", "/api/trade/v1/order/limit/bulk"): self.limit_bulk,
+        }
+        self._order_ids = itertools.count(1)
+
+        self._httpd = ThreadingHTTPServer((host, port), self._handler())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="stub-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    ### endpoints ###
+    def login(self, query, body, headers):  # noqa
+        user_id = str(body.get("userId", ""))
+        if not user_id or not body.get("password"):
+            return HTTPStatus.UNAUTHORIZED, dict(code="401", message="Invalid credentials")
+
+        return HTTPStatus.OK, dict(code="200", result=dict(
+            token=_fake_jwt(user_id),
+            user=dict(
+                source=body.get("source", "WEB"),
+                metatraderId=user_id,
+                metatraderGroup="stub\\group",
+                isDemo=self.account != AccountType.LIVE,
+                traderSubcription="stub",
+                marketSubcription="stub",
+                traderSubscription="stub",
+                marketSubscription="stub",
+                tenantId=self.client,
+                mainProductCode="METATRADER5",
+                omsServerId=f"{self.client}-oms",
+            )
+        ))
+
+    def pending(self, query, body, headers):  # noqa
+        symbol = query.get("symbol", ["EURUSD.std"])[0]
+        row = dict(orderId=0, symbol=symbol, type="BUY_LIMIT", volume=0.01, price=1.0, createTime=int(time.time() * 1000))
+        placed = [order for order in self._visible(pending=True) if order["symbol"] == symbol]
+        return HTTPStatus.OK, dict(code="200", result=self._pad([row], row) + placed)
+
+    def order(self, query, body, headers):  # noqa
+        if not body.get("symbol") or not body.get("volume") or body["volume"] <= 0:
+            return HTTPStatus.BAD_REQUEST, dict(code="400", message="Invalid order")
+
+        order_id = self._place(body)
+        return HTTPStatus.OK, dict(code="200", result=dict(orderId=order_id, symbol=body["symbol"], status="SUCCESS"))
+
+    def cancel(self, query, body, headers):  # noqa
+        order_id = int(query.get("orderId", ["0"])[0])
+        if self.orders.pop(order_id, None) is None:
+            return HTTPStatus.NOT_FOUND, dict(code="404", message=f"Order {order_id} not found")
+        return HTTPStatus.OK, dict(code="200", result=dict(orderId=order_id, status="CANCELLED"))
+
+    def _place(self, order):
+        order_id = next(self._order_ids)
+        row = dict(order, orderId=order_id, createTime=int(time.time() * 1000))
+        self.orders[order_id] = (row, time.monotonic() + self.propagation)
+        return order_id
+
+    def pending_details(self, query, body, headers):  # noqa
+        order_id = int(query.get("orderId", ["0"])[0])
+        return HTTPStatus.OK, dict(code="200", result=[
+            order for order in self._visible(pending=True) if order["orderId"] == order_id
+        ])
+
+    def deal_histories(self, query, body, headers):  # noqa
+        symbol = query.get("symbol", [None])[0]
+        placed = [order for order in self._visible(pending=False) if symbol is None or order["symbol"] == symbol]
+        if "page" not in query:
+            return HTTPStatus.OK, dict(code="200", result=placed)
+
+        page, size = int(query["page"][0]), int(query.get("size", ["100"])[0])
+        total = self.history + len(placed)
+        start, stop = (page - 1) * size, min(page * size, total)
+        rows = [
+            dict(orderId=-index - 1, symbol=symbol or "EURUSD.std", type="BUY", volume=0.01, price=1.0, createTime=index)
+            if index < self.history else placed[index - self.history]
+            for index in range(start, stop)
+        ]
+        return HTTPStatus.OK, dict(code="200", result=rows, total=total, totalPages=math.ceil(total / size))
+
+    def counts(self, query, body, headers):  # noqa
+        return HTTPStatus.OK, dict(code="200", result=dict(
+            pending=len(self._visible(pending=True)), deals=len(self._visible(pending=False))
+        ))
+
+    def _visible(self, pending):
+        now = time.monotonic()
+        return [
+            order for order, visible_at in list(self.orders.values())
+            if visible_at <= now and str(order.get("type", "")).endswith(("_LIMIT", "_STOP")) == pending
+        ]
+
+    def company(self, query, body, headers):  # noqa
+        return HTTPStatus.OK, dict(code="200", result=dict(tenantId="stub", name="Stub company", currency="USD"))
+
+    def bulk(self, query, body, headers, limit=False):  # noqa
+        orders = body.get("orders")
+        if not isinstance(orders, list) or not orders:
+            return HTTPStatus.BAD_REQUEST, dict(code="400", message="orders must be a non empty list")
+
+        results = []
+        for order in orders:
+            if not order.get("symbol"):
+                results.append(dict(symbol=None, status="FAILED", message="Missing symbol"))
+            elif not order.get("volume") or order["volume"] <= 0:
+                results.append(dict(symbol=order["symbol"], status="FAILED", message="Invalid volume"))
+            elif limit and not order.get("price"):
+                results.append(dict(symbol=order["symbol"], status="FAILED", message="Missing price"))
+            else:
+                results.append(dict(orderId=self._place(order), symbol=order["symbol"], status="SUCCESS"))
+        return HTTPStatus.OK, dict(code="200", result=results)
+
+    def limit_bulk(self, query, body, headers):
+        return self.bulk(query, body, headers, limit=True)
+
+    def _pad(self, rows, template):
+        # grow a result list until the encoded payload reaches payload_size bytes
+        if self.payload_size <= 0:
+            return rows
+        row_size = len(json.dumps(template)) + 2
+        return rows + [template | dict(orderId=i) for i in range(1, max(self.payload_size // row_size, 1))]
+
+    ### http ###
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, like the real host
+            disable_nagle_algorithm = True
+            wbufsize = -1  # headers and body leave in one write, avoids delayed-ACK stalls on small responses
+
+            def log_message(self, *args):
+                pass
+
+            def _dispatch(self):
+                server.requests += 1
+                url = urlsplit(self.path)
+                length = int(self.headers.get("Content-Length") or 0)
+                raw = self.rfile.read(length) if length else b""
+                try:
+                    body = json.loads(raw) if raw else {}
+                except ValueError:
+                    body = {}
+
+                route = server.routes.get((self.command, url.path))
+                if route is None:
+                    status, payload = HTTPStatus.NOT_FOUND, dict(code="404", message=f"No stub for {self.command} {url.path}")
+                elif not url.path.startswith("/api/auth/") and not self.headers.get("authorization", "").startswith("Bearer "):
+                    status, payload = HTTPStatus.UNAUTHORIZED, dict(code="401", message="Missing bearer token")
+                else:
+                    status, payload = route(parse_qs(url.query), body, self.headers)
+
+                if delay := server.latency + random.uniform(-server.jitter, server.jitter):
+                    time.sleep(max(delay, 0))
+
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = _dispatch
+
+        return Handler
@@ -0,0 +1,116 @@
+import asyncio
+import base64
+import binascii
+import json
+import threading
+import time
+import weakref
+
+from src import consts
+from src.utils.file_utils import file_lock, read_json, write_json_atomic
+
+
+def decode_token_expiry(token: str):
+    """Return the `exp` claim (epoch seconds) of a JWT, None for opaque tokens."""
+    try:
+        payload = token.split(".")[1]
+        claims = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+        return float(claims["exp"])
+    except (IndexError, KeyError, TypeError, ValueError, binascii.Error):
+        return None
+
+
+class TokenCache:
+    """Login tokens shared by packages and xdist workers through a locked json file.
+
+    A token is reused until `refresh_before` seconds before its expiry, then the next caller logs in again.
+    """
+
+    def __init__(self, path=consts.TOKEN_CACHE_FILE, refresh_before=60):
+        self.path = path
+        self.lock_path = path.with_suffix(".lock")
+        self.refresh_before = refresh_before
+        self.enabled = True
+        self._memory = {}
+        self._lock = threading.Lock()
+        self._loop_locks = weakref.WeakKeyDictionary()  # event loop -> asyncio.Lock
+
+    def _is_fresh(self, entry):
+        return bool(entry) and entry["exp"] - self.refresh_before > time.time()
+
+    def get(self, key):
+        if not self.enabled:
+            return None
+
+        entry = self._memory.get(key)
+        if not self._is_fresh(entry):
+            with file_lock(self.lock_path):
+                entry = read_json(self.path, {}).get(key)
+            if not self._is_fresh(entry):
+                return None
+            self._memory[key] = entry
+        return entry["token"]
+
+    def put(self, key, token):
+        if not self.enabled or (exp := decode_token_expiry(token)) is None:
+            return
+
+        entry = dict(token=token, exp=exp)
+        self._memory[key] = entry
+        with file_lock(self.lock_path):
+            tokens = read_json(self.path, {})
+            tokens[key] = entry
+            write_json_atomic(self.path, self._drop_expired(tokens))
+
+    def get_or_login(self, key, login):
+        """Return a fresh cached token, or call `login()` once while holding the lock so other workers wait for it."""
+        if not self.enabled:
+            return login()
+
+        if token := self.get(key):
+            return token
+
+        with self._lock, file_lock(self.lock_path):
+            tokens = read_json(self.path, {})
+            if self._is_fresh(entry := tokens.get(key)):  # another worker logged in meanwhile
+                self._memory[key] = entry
+                return entry["token"]
+
+            token = login()
+            self._store(tokens, key, token)
+            return token
+
+    async def get_or_login_async(self, key, login):
+        """`get_or_login` for a coroutine `login`, coroutines of one event loop wait for a single login.
+
+        The locks and the file I/O are taken on a worker thread, where `login` runs on an event loop of its own: the
+        caller's loop never blocks while another worker logs in, and a sync `get_or_login` on the loop thread only
+        waits for that thread.
+        """
+        if not self.enabled:
+            return await login()
+
+        if self._is_fresh(entry := self._memory.get(key)):
+            return entry["token"]
+
+        loop_lock = self._loop_locks.setdefault(asyncio.get_running_loop(), asyncio.Lock())
+        async with loop_lock:
+            return await asyncio.to_thread(self.get_or_login, key, lambda: asyncio.run(login()))
+
+    def _store(self, tokens, key, token):
+        if (exp := decode_token_expiry(token)) is not None:
+            tokens[key] = self._memory[key] = dict(token=token, exp=exp)
+            write_json_atomic(self.path, self._drop_expired(tokens))
+
+    def clear(self):
+        self._memory.clear()
+        with file_lock(self.lock_path):
+            write_json_atomic(self.path, {})
+
+    @staticmethod
+    def _drop_expired(tokens):
+        now = time.time()
+        return {key: entry for key, entry in tokens.items() if entry["exp"] > now}
+
+
+token_cache = TokenCache()
@@ -0,0 +1,163 @@
+import gzip
+import json
+import os
+import queue
+import shutil
+import threading
+import time
+
+from src.data_runtime import DataRuntime
+from src.utils.file_utils import worker_path
+from src.utils.logger_utils import logger
+
+_STOP = object()
+
+
+def current_nodeid():
+    # "tests/x.py::test_y (call)" set by pytest for the running test, absent outside tests
+    return os.environ.get("PYTEST_CURRENT_TEST", "").rsplit(" (", 1)[0] or None
+
+
+def _body_size(body):
+    if body is None:
+        return 0
+    return len(body) if isinstance(body, (bytes, str)) else 0
+
+
+def _truncate(body, limit):
+    if not body:
+        return None
+    if isinstance(body, bytes):
+        body = body[:limit].decode("utf8", errors="replace")
+    return body[:limit]
+
+
+class TrafficLog:
+    """Compact jsonl record of every response, written by a background thread.
+
+    The record is built on the caller thread from already known values, serialization and writes happen on the
+    writer thread in batches. The file is rotated past `max_bytes` into `path.1` ... `path.<backups>`, gzipped when
+    `compress` is set. Bodies are only kept with `body_limit > 0`, truncated to that many characters. Each xdist worker
+    writes and rotates its own `<stem>.<worker><suffix>` file.
+    """
+
+    def __init__(self, maxsize=10000):
+        self.path = None
+        self.max_bytes = 0
+        self.backups = 0
+        self.compress = False
+        self.body_limit = 0
+        self.records = 0
+        self.dropped = 0  # records lost to write or rotation errors
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._thread = None
+        self._file = None
+
+    @property
+    def enabled(self):
+        return self._thread is not None
+
+    def open(self, path, *, max_bytes=100 * 1024 ** 2, backups=5, compress=False, body_limit=0):
+        self.path = worker_path(path)
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.compress = compress
+        self.body_limit = body_limit
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = self.path.open("a", encoding="utf8")
+        self._thread = threading.Thread(target=self._run, name="traffic-log-writer", daemon=True)
+        self._thread.start()
+
+    def close(self):
+        if self._thread is None:
+            return
+        self._queue.put(_STOP)
+        self._thread.join()
+        self._thread = None
+        self._file.close()
+        self._file = None
+
+    def log(self, resp, retries=0):
+        request = resp.request
+        option = DataRuntime.option or {}
+        record = dict(
+            ts=round(time.time(), 3),
+            node=current_nodeid(),
+            method=request.method,
+            path=request.path_url,
+            status=resp.status_code,
+            elapsed_ms=round(resp.elapsed.total_seconds() * 1000, 1),
+            req_bytes=_body_size(request.body),
+            resp_bytes=len(resp.content),
+            retries=retries,
+            client=option.get("client"),
+            server=option.get("server"),
+            account=option.get("account"),
+        )
+        if self.body_limit:
+            record["req_body"] = _truncate(request.body, self.body_limit)
+            record["resp_body"] = _truncate(resp.content, self.body_limit)
+        self._queue.put(record)
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < 1000:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = batch[-1] is _STOP
+            records = [record for record in batch if record is not _STOP]
+            if records:
+                # errors are logged, the thread must keep draining the queue or log() blocks the run
+                try:
+                    self._write(records)
+                except Exception as error:  # noqa
+                    self.dropped += len(records)
+                    logger.warning(f"Traffic log: {len(records)} records dropped: {error!r}")
+                else:
+                    try:
+                        if self._file.tell() >= self.max_bytes:
+                            self._rotate()
+                    except Exception as error:  # noqa
+                        logger.warning(f"Traffic log: rotation failed: {error!r}")
+            for _ in batch:
+                self._queue.task_done()
+            if stop:
+                return
+
+    def _write(self, records):
+        if self._file.closed:  # a failed rotation, try the path again
+            self._file = self.path.open("a", encoding="utf8")
+        self._file.write("".join(json.dumps(record, separators=(",", ":")) + "\n" for record in records))
+        self._file.flush()
+        self.records += len(records)
+
+    def _rotate(self):
+        self._file.close()
+        suffix = ".gz" if self.compress else ""
+        for index in range(self.backups - 1, 0, -1):
+            source = self.path.with_name(f"{self.path.name}.{index}{suffix}")
+            if source.exists():
+                os.replace(source, self.path.with_name(f"{self.path.name}.{index + 1}{suffix}"))
+
+        if self.backups:
+            first = self.path.with_name(f"{self.path.name}.1")
+            os.replace(self.path, first)
+            if self.compress:
+                with open(first, "rb") as _src, gzip.open(f"{first}.gz", "wb") as _dst:
+                    shutil.copyfileobj(_src, _dst)
+                os.remove(first)
+        else:
+            os.remove(self.path)
+        self._file = self.path.open("a", encoding="utf8")
+
+    def flush(self):
+        """Block until every queued record is written."""
+        self._queue.join()
+
+
+traffic_log = TrafficLog()
@@ -0,0 +1,97 @@
+import asyncio
+import random
+import time
+
+from src.utils import Dotdict
+from src.utils.allure_utils import attach_request_response
+from src.utils.assert_utils import soft_assert, assert_log
+from src.utils.datetime_utils import get_current_time
+
+
+def iter_intervals(initial=0.05, factor=2.0, maximum=2.0, jitter=0.0):
+    """Exponential backoff: initial, initial * factor, ... capped at `maximum`, each +/- `jitter` (relative)."""
+    interval = initial
+    while True:
+        yield interval * random.uniform(1 - jitter, 1 + jitter) if jitter else interval
+        interval = min(interval * factor, maximum)
+
+
+def _body(resp):
+    if resp is None:  # connection error, swallowed by XRequest
+        return None
+    try:
+        body = resp.json()
+    except ValueError:
+        return None
+    return Dotdict(body) if isinstance(body, dict) else body
+
+
+def _satisfied(until, resp):
+    body = _body(resp)
+    if body is None:
+        return False
+    try:
+        return bool(until(body))
+    except (KeyError, IndexError, TypeError, AttributeError):
+        return False
+
+
+def _log_outcome(desc, ok, polls, elapsed, timeout):
+    assert_log(
+        actual=f"{'settled' if ok else 'not settled'} after {elapsed:.2f}s ({polls} polls)",
+        expected=f"settled within {timeout}s",
+        msg=f"Verify {desc} within {timeout}s",
+        result=soft_assert(ok, f"{desc} not settled within {timeout}s"),
+    )
+
+
+class _Poll:
+    """Polling state shared by the sync and async waits: `check` each response, sleep what it returns until None."""
+
+    def __init__(self, method, until, desc, timeout, initial, factor, max_interval, jitter, attach):
+        self.until = until
+        self.desc = desc or getattr(method, "__qualname__", "condition")
+        self.timeout = timeout
+        self.attach = attach
+        self.start = time.monotonic()
+        self.deadline = self.start + timeout
+        self.intervals = iter_intervals(initial, factor, max_interval, jitter)
+        self.polls = 0
+        self.ok = False
+        self.resp = None
+
+    def check(self, resp):
+        self.resp = resp
+        self.polls += 1
+        self.ok = _satisfied(self.until, resp)
+        remaining = self.deadline - time.monotonic()
+        if self.ok or remaining <= 0:
+            return None
+        return min(next(self.intervals), remaining)
+
+    def finish(self):
+        if self.attach and self.resp is not None:
+            attach_request_response(self.resp, request_time=get_current_time())
+        _log_outcome(self.desc, self.ok, self.polls, time.monotonic() - self.start, self.timeout)
+        return self.resp
+
+
+def wait_until(method, *args, until, desc=None, timeout=30.0, initial=0.05, factor=2.0, max_interval=2.0, jitter=0.25, attach=True, **kwargs):
+    """Call the route `method(*args, **kwargs)` until `until(body)` holds on its parsed body, or `timeout` is over.
+
+    Polls start short and back off exponentially with jitter. Only the final outcome is logged (soft assert), only the
+    last response is attached to the report (none with `attach=False`). Returns the last XResponse (None if the last
+    call failed to connect).
+    """
+    poll = _Poll(method, until, desc, timeout, initial, factor, max_interval, jitter, attach)
+    while (delay := poll.check(method(*args, attach=False, **kwargs))) is not None:
+        time.sleep(delay)
+    return poll.finish()
+
+
+async def wait_until_async(method, *args, until, desc=None, timeout=30.0, initial=0.05, factor=2.0, max_interval=2.0, jitter=0.25, attach=True, **kwargs):
+    """`wait_until` for the async route clients, waits don't block the event loop."""
+    poll = _Poll(method, until, desc, timeout, initial, factor, max_interval, jitter, attach)
+    while (delay := poll.check(await method(*args, attach=False, **kwargs))) is not None:
+        await asyncio.sleep(delay)
+    return poll.finish()
@@ -0,0 +1,79 @@
+import pytest
+
+from src.core import retry
+from src.core.retry import CircuitBreaker, CircuitOpenError, RetryStats, _clamp_timeout
+
+HOST = "stub:8080"
+
+
+@pytest.fixture(autouse=True)
+def retry_stats(monkeypatch):
+    # keep the session's retry summary free of these fake hosts
+    stats = RetryStats()
+    monkeypatch.setattr(retry, "retry_stats", stats)
+    return stats
+
+
+def _fail(breaker, times):
+    for _ in range(times):
+        breaker.before(HOST)
+        breaker.failure(HOST)
+
+
+def test_opens_after_threshold_and_fails_fast(retry_stats):
+    breaker = CircuitBreaker(threshold=3, cooldown=60)
+    _fail(breaker, 2)
+    breaker.before(HOST)  # still closed
+
+    breaker.failure(HOST)
+    with pytest.raises(CircuitOpenError):
+        breaker.before(HOST)
+    assert (retry_stats.hosts[HOST].breaker_opens, retry_stats.hosts[HOST].fast_failed) == (1, 1)
+
+
+def test_success_resets_the_failure_count():
+    breaker = CircuitBreaker(threshold=3, cooldown=60)
+    _fail(breaker, 2)
+    breaker.success(HOST)
+    _fail(breaker, 2)
+    breaker.before(HOST)
+
+
+def test_half_open_lets_a_single_probe_through():
+    breaker = CircuitBreaker(threshold=1, cooldown=0)
+    _fail(breaker, 1)
+
+    breaker.before(HOST)  # the probe
+    with pytest.raises(CircuitOpenError):
+        breaker.before(HOST)  # others fail fast while it runs
+
+    breaker.success(HOST)
+    breaker.before(HOST)
+    breaker.before(HOST)
+
+
+def test_failed_probe_reopens():
+    breaker = CircuitBreaker(threshold=1, cooldown=0)
+    _fail(breaker, 1)
+    breaker.before(HOST)
+    breaker.failure(HOST)
+
+    breaker.cooldown = 60
+    with pytest.raises(CircuitOpenError):
+        breaker.before(HOST)
+
+
+def test_ended_probe_can_be_retried():
+    breaker = CircuitBreaker(threshold=1, cooldown=0)
+    _fail(breaker, 1)
+    breaker.before(HOST)
+    breaker.end_probe(HOST)  # e.g. the probe raised a non-retryable error
+
+    breaker.before(HOST)
+
+
+def test_clamp_timeout():
+    assert _clamp_timeout(30, 5) == 5
+    assert _clamp_timeout(2, 5) == 2
+    assert _clamp_timeout((3, None), 5) == (3, 5)
+    assert _clamp_timeout((10, 60), 5) == (5, 5)
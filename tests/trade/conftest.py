@@ -1,9 +1,35 @@
 import pytest
 
 from src.routes.auth.auth_client import AuthClient
-from src.routes.market.market_client import MarketClient
+from src.routes.market.market_client import MarketClient, AsyncMarketClient
+from src.routes.trade.trade_client import TradeClient, AsyncTradeClient
 
 
 @pytest.fixture(scope="package")
 def market_client():
     return MarketClient()
+
+
+@pytest.fixture(scope="session")
+def async_market_client(async_loop):
+    return AsyncMarketClient()
+
+
+@pytest.fixture(scope="package")
+def trade_client():
+    return TradeClient()
+
+
+@pytest.fixture(scope="session")
+def async_trade_client(async_loop):
+    return AsyncTradeClient()
+
+
+@pytest.fixture
+def placed_orders(trade_client):
+    # ids of the orders a test places, cancelled once it ends
+    order_ids = []
+    yield order_ids
+    for order_id in order_ids:
+        if order_id is not None:  # placement failed
+            trade_client.trade.delete(order_id)
@@ -0,0 +1,22 @@
+import pytest
+
+from src.utils.bulk_utils import build_orders, accepted_order_ids
+
+pytestmark = pytest.mark.places_orders
+
+
+def test_place_bulk_market_orders(trade_client, placed_orders):
+    resp = trade_client.bulk.place(build_orders("EURUSD.std", 5))
+    placed_orders.extend(accepted_order_ids(resp))
+    resp.check_status_code(200)
+    resp.check_payload({"result[*].status": "SUCCESS"})
+
+
+def test_place_bulk_limit_orders_concurrently(async_trade_client, async_loop, placed_orders):
+    orders = build_orders("EURUSD.std", 200, order_type="BUY_LIMIT", price=1.0, price_step=-0.0001)
+    resps = async_loop.run_until_complete(async_trade_client.limit_bulk.place_many(orders, batch_size=50, limit=4))
+    for resp in resps:
+        placed_orders.extend(accepted_order_ids(resp))
+    for resp in resps:
+        resp.check_status_code(200)
+        resp.check_payload({"result[*].status": "SUCCESS"})
@@ -0,0 +1,23 @@
+from src.utils.assert_utils import check_equals, check_less_equal
+
+
+def test_stream_deal_histories(stub_server, trade_client, monkeypatch):
+    monkeypatch.setattr(stub_server, "history", 1000)
+    # no order placed by the other tests is on this symbol, only the 1000 past deals are served
+    deals = trade_client.deal_histories.iter_rows(
+        dict(symbol="USDJPY.std"), page_size=200, prefetch=3, schema=trade_client.deal_histories.row_schema
+    )
+    fetch, ahead = deals._fetch, []
+
+    def recording_fetch(page):
+        if deals.pages:  # pages requested past the one being read
+            ahead.append(page - deals.pages)
+        return fetch(page)
+
+    monkeypatch.setattr(deals, "_fetch", recording_fetch)
+    order_ids = {deal.orderId for deal in deals}
+
+    check_equals(deals.rows, 1000, "streamed deals")
+    check_equals(len(order_ids), deals.rows, "streamed deals are unique")
+    check_equals(deals.pages, 5, "pages fetched")
+    check_less_equal(max(ahead, default=0), 3, "pages requested ahead of the one being read")
@@ -0,0 +1,28 @@
+import pytest
+
+from src.utils.order_tracer import OrderTracer, PendingProbe, PendingDetailsProbe
+
+pytestmark = pytest.mark.places_orders
+
+
+def test_limit_order_propagates_to_pending(async_trade_client, async_loop, placed_orders):
+    tracer = OrderTracer(async_trade_client, timeout=10)
+    trace = async_loop.run_until_complete(tracer.trace(dict(symbol="EURUSD.std", type="BUY_LIMIT", volume=0.01, price=1.0)))
+    placed_orders.append(trace.order_id)
+    assert not trace.missed, f"Order {trace.order_id} never reached {trace.missed} within 10s"
+
+
+def test_limit_orders_propagate_concurrently(async_trade_client, async_loop, placed_orders):
+    tracer = OrderTracer(async_trade_client, probes=(PendingProbe(), PendingDetailsProbe()), timeout=10)
+    orders = [dict(symbol="EURUSD.std", type="BUY_LIMIT", volume=0.01, price=round(1.0 - i * 0.0001, 4)) for i in range(10)]
+    traces = async_loop.run_until_complete(tracer.trace_many(orders, limit=5))
+    placed_orders.extend(trace.order_id for trace in traces)
+    for trace in traces:
+        assert not trace.missed, f"Order {trace.order_id} never reached {trace.missed} within 10s"
+
+
+def test_market_order_is_filled(async_trade_client, async_loop, placed_orders):
+    tracer = OrderTracer(async_trade_client, timeout=10)
+    trace = async_loop.run_until_complete(tracer.trace(dict(symbol="EURUSD.std", type="BUY", volume=0.01)))
+    placed_orders.append(trace.order_id)
+    assert not trace.missed, f"Order {trace.order_id} never reached {trace.missed} within 10s"
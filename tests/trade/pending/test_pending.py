@@ -1,3 +1,32 @@
+import pytest
+
+from src.utils.wait_utils import wait_until
+
+
 def test_get_symbol(market_client):
     resp = market_client.pending.get(dict(symbol="DASHUSD.std"))
-    resp.check_status_code(200)
\ No newline at end of file
+    resp.check_status_code(200)
+
+
+def test_get_symbols_concurrently(async_market_client, async_loop):
+    symbols = ["DASHUSD.std", "BTCUSD.std", "ETHUSD.std", "EURUSD.std", "XAUUSD.std"]
+    resps = async_loop.run_until_complete(
+        async_market_client.pending.get_many([dict(symbol=symbol) for symbol in symbols])
+    )
+    for resp in resps:
+        resp.check_status_code(200)
+
+
+@pytest.mark.places_orders
+def test_placed_limit_order_shows_in_pending(trade_client, placed_orders):
+    order = trade_client.trade.required_payload("EURUSD.std", "BUY_LIMIT", price=1.0)
+    resp = trade_client.trade.post(order)
+    resp.check_status_code(200)
+
+    order_id = resp.json()["result"]["orderId"]
+    placed_orders.append(order_id)
+    wait_until(
+        trade_client.pending.get, dict(symbol="EURUSD.std"),
+        until=lambda body: any(row.orderId == order_id for row in body.result),
+        desc=f"order {order_id} in pending", timeout=10,
+    )
@@ -0,0 +1,198 @@
+import hashlib
+import json
+import uuid
+
+import pytest
+import requests
+from allure_commons import plugin_manager, model2
+from allure_commons.logger import AllureFileLogger
+
+from src.core.response import XResponse
+from src.data_runtime import DataRuntime
+from src.utils import Dotdict
+from src.utils.matrix_utils import MATRIX_ENV
+from src.utils.allure_utils import (
+    AttachmentWriter, AttachmentStats, ResultProcessor, PROCESSED_MANIFEST, truncate_body, request_response_content,
+    content_file_name, custom_allure_result,
+)
+
+
+@pytest.fixture
+def allure_dir(tmp_path):
+    file_logger = AllureFileLogger(tmp_path)
+    plugin_manager.register(file_logger)
+    yield tmp_path
+    plugin_manager.unregister(file_logger)
+
+
+@pytest.fixture
+def writer(allure_dir, monkeypatch):
+    writer = AttachmentWriter(stats=AttachmentStats(), max_sources=2)
+    # the entry would be registered on the running allure test, only the file name matters here
+    monkeypatch.setattr(writer, "_register", lambda source, name, attachment_type: (f"{source}-attachment.txt", allure_dir))
+    return writer
+
+
+def _response(token, create_time, symbol="EURUSD.std"):
+    request = requests.Request(
+        "POST", "http://stub/api/order/v1/pending", headers=dict(authorization=f"Bearer {token}"),
+        json=dict(user="demo", password="secret"),
+    ).prepare()
+    resp = requests.Response()
+    resp.request, resp.status_code = request, 200
+    resp._content = f'{{"code": "200", "result": [{{"symbol": "{symbol}", "createTime": {create_time}}}]}}'.encode()
+    return XResponse(resp)
+
+
+def test_identical_attachments_are_written_once(writer, allure_dir):
+    for _ in range(5):
+        writer.attach(lambda: "body", dedupe=True)
+    writer.flush()
+
+    (written,) = allure_dir.glob("*-attachment.txt")
+    assert written.name == content_file_name("x-attachment.txt", b"body")
+    (counts,) = writer.stats.tests.values()
+    assert (counts.count, counts.written, counts.saved) == (5, 1, 4)
+
+
+def test_evicted_file_is_found_on_disk(writer, allure_dir):
+    for body in ("a", "b", "c", "a"):  # "a" is out of the 2 remembered files when attached again
+        writer.attach(lambda body=body: body, dedupe=True)
+    writer.flush()
+
+    assert len(list(allure_dir.glob("*-attachment.txt"))) == 3
+    (counts,) = writer.stats.tests.values()
+    assert (counts.count, counts.written, counts.saved) == (4, 3, 1)
+
+
+def test_settle_points_entries_at_written_files(writer):
+    registered = []
+    writer._register = lambda source, name, attachment_type: (registered.append(f"{source}-attachment.txt") or registered[-1], None)
+    for body in ("a", "a", "b"):
+        writer.attach(lambda body=body: body, dedupe=True)
+
+    step = model2.TestStepResult(attachments=[model2.Attachment(source=registered[2])])
+    result = model2.TestResult(attachments=[model2.Attachment(source=name) for name in registered[:2]], steps=[step])
+    writer.settle(result)
+
+    assert [attachment.source for attachment in result.attachments] == [content_file_name("x-attachment.txt", b"a")] * 2
+    assert step.attachments[0].source == content_file_name("x-attachment.txt", b"b")
+
+
+def test_nothing_is_rendered_without_allure(monkeypatch):
+    monkeypatch.setattr(plugin_manager, "get_plugins", lambda: [])  # no --alluredir
+    writer = AttachmentWriter(stats=AttachmentStats())
+    writer.attach(lambda: pytest.fail("rendered"), dedupe=True)
+    assert writer._thread is None and not writer.stats.tests
+
+
+def test_only_credentials_are_masked():
+    curl, data = request_response_content(_response("token-1", 1000))
+    assert "token-1" not in curl and "secret" not in curl
+    assert '"user": "demo"' in curl
+    assert data["result"][0]["createTime"] == 1000
+
+
+def test_truncate_body():
+    assert truncate_body("x" * 10, 10) == "x" * 10
+    assert truncate_body("x" * 20, 0) == "x" * 20
+
+    body = truncate_body("x" * 25, 10)
+    assert body.startswith("x" * 10 + "\n... truncated 15 of 25 characters, sha256: ")
+    assert body != truncate_body("y" * 25, 10)
+
+
+def test_attachment_stats_summary():
+    stats = AttachmentStats()
+    stats.record("tests/a.py::test_a", new=True)
+    stats.record_write("tests/a.py::test_a", 2048)
+    stats.record("tests/a.py::test_a", new=False)
+    stats.record("tests/b.py::test_b", new=True)
+    stats.record_write("tests/b.py::test_b", 1024)
+
+    lines = stats.format_summary().splitlines()
+    assert lines[0] == "attachments: 3 | files written: 2 | deduplicated: 1 | size: 3.0KB"
+    assert lines[1].strip().startswith("tests/a.py::test_a | attachments: 2 | written: 1 | size: 2.0KB")
+
+
+def _result_file(allure_dir, name):
+    labels = [dict(name="suite", value="MT5"), dict(name="host", value="ci"), dict(name="subSuite", value="DEMO")]
+    path = allure_dir / f"{uuid.uuid4()}-result.json"
+    path.write_text(json.dumps(dict(fullName=name, labels=labels)), encoding="utf8")
+    return path
+
+
+def _manifest(allure_dir):
+    return set((allure_dir / PROCESSED_MANIFEST).read_text(encoding="utf8").split())
+
+
+def test_results_are_processed_once(tmp_path):
+    paths = [_result_file(tmp_path, f"tests.test_{i}") for i in range(3)]
+    assert custom_allure_result(tmp_path) == 3
+    assert _manifest(tmp_path) == {path.name for path in paths}
+
+    result = json.loads(paths[0].read_text(encoding="utf8"))
+    assert result["historyId"]
+    assert [label["name"] for label in result["labels"]] == ["suite", "subSuite"]
+
+    paths[0].write_text(json.dumps(result | dict(historyId="kept")), encoding="utf8")
+    assert custom_allure_result(tmp_path) == 0
+    assert json.loads(paths[0].read_text(encoding="utf8"))["historyId"] == "kept"
+
+
+def test_manifest_drops_removed_results(tmp_path):
+    removed, kept = _result_file(tmp_path, "tests.test_a"), _result_file(tmp_path, "tests.test_b")
+    custom_allure_result(tmp_path)
+    removed.unlink()
+    added = _result_file(tmp_path, "tests.test_c")
+
+    assert custom_allure_result(tmp_path) == 1
+    assert _manifest(tmp_path) == {kept.name, added.name}
+
+
+def test_process_pool_matches_serial(tmp_path):
+    serial, pooled = tmp_path / "serial", tmp_path / "pooled"
+    serial.mkdir(), pooled.mkdir()
+    for i in range(4):
+        for allure_dir in (serial, pooled):
+            (allure_dir / f"{i}-result.json").write_text(json.dumps(dict(fullName=f"tests.test_{i}", labels=[])), encoding="utf8")
+
+    assert custom_allure_result(serial) == custom_allure_result(pooled, workers=2) == 4
+    for i in range(4):
+        assert (serial / f"{i}-result.json").read_text(encoding="utf8") == (pooled / f"{i}-result.json").read_text(encoding="utf8")
+
+
+def test_reported_results_are_skipped(tmp_path):
+    older = _result_file(tmp_path, "tests.test_old")
+    processor = ResultProcessor(tmp_path)
+
+    result = model2.TestResult(uuid=str(uuid.uuid4()), fullName="tests.test_new", labels=[model2.Label(name="host", value="ci")])
+    processor.report_result(result)
+    AllureFileLogger(tmp_path).report_result(result)
+    (reported,) = processor.reported()
+
+    assert custom_allure_result(tmp_path, processed=processor.reported()) == 1
+    assert _manifest(tmp_path) == {older.name, reported}
+    written = json.loads((tmp_path / reported).read_text(encoding="utf8"))
+    assert written["historyId"] == result.historyId
+    assert "labels" not in written  # host label filtered before the write, empty lists aren't written
+
+
+def test_history_id_keeps_the_client_server_input(tmp_path, monkeypatch):
+    monkeypatch.setattr(DataRuntime, "option", Dotdict(client="lirunex", server="mt5", account="demo"))
+    expected = hashlib.md5(b"tests.test_alirunexmt5").hexdigest()
+
+    result = model2.TestResult(fullName="tests.test_a")
+    ResultProcessor(tmp_path).report_result(result)
+    assert result.historyId == expected
+
+    # a result processed afterwards gets the same id from its suite labels
+    labels = [dict(name="parentSuite", value="LIRUNEX"), dict(name="suite", value="MT5"), dict(name="subSuite", value="DEMO")]
+    path = tmp_path / "a-result.json"
+    path.write_text(json.dumps(dict(fullName="tests.test_a", labels=labels)), encoding="utf8")
+    custom_allure_result(tmp_path)
+    assert json.loads(path.read_text(encoding="utf8"))["historyId"] == expected
+
+    monkeypatch.setenv(MATRIX_ENV, "lirunex-mt5-demo")  # combinations of a matrix run also differ by account
+    ResultProcessor(tmp_path).report_result(result)
+    assert result.historyId == hashlib.md5(b"tests.test_alirunexmt5demo").hexdigest()
@@ -0,0 +1,36 @@
+import copy
+import json
+import pickle
+
+from src.utils import Dotdict
+
+
+def _data():
+    return Dotdict({"a": {"b": [{"c": 1}, {"c": 2}]}})
+
+
+def test_views_are_cached_and_do_not_rewrite_the_data():
+    data = _data()
+    assert data.a is data.a and data.a.b[0] is data.a.b[0]
+    assert type(dict.__getitem__(data, "a")) is dict
+    assert data.a.missing == "[~~missing-key-missing~~]"
+
+
+def test_nested_writes_reach_the_data():
+    data = _data()
+    data.a.b[0].c = 5
+    data.a.b.append({"c": 3})
+    data.a.x = 9
+    del data.a.b[1]
+
+    assert json.dumps(data) == '{"a": {"b": [{"c": 5}, {"c": 3}], "x": 9}}'
+    assert data.a.b[-1].c == 3
+    assert copy.deepcopy(data).a.b[0].c == pickle.loads(pickle.dumps(data)).a.b[0].c == 5
+
+
+def test_copies_of_a_view_do_not_write_through():
+    data = _data()
+    for detached in (copy.deepcopy(data.a), pickle.loads(pickle.dumps(data.a))):
+        detached.x = 1
+        detached.b.append({})
+    assert json.dumps(data) == '{"a": {"b": [{"c": 1}, {"c": 2}]}}'
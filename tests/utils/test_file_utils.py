@@ -0,0 +1,20 @@
+from pathlib import Path
+
+from src.utils.file_utils import worker_path, worker_files
+
+
+def test_worker_path(monkeypatch):
+    monkeypatch.delenv("PYTEST_XDIST_WORKER", raising=False)
+    assert worker_path("out/cassette.jsonl") == Path("out/cassette.jsonl")
+
+    monkeypatch.setenv("PYTEST_XDIST_WORKER", "gw3")
+    assert worker_path("out/cassette.jsonl") == Path("out/cassette.gw3.jsonl")
+
+
+def test_worker_files_in_worker_order(tmp_path):
+    for name in ("cassette.jsonl", "cassette.gw10.jsonl", "cassette.gw2.jsonl", "cassette.mt5.jsonl",
+                 "cassette.gwx.jsonl", "cassette.mt5.gw0.jsonl"):
+        (tmp_path / name).touch()
+
+    assert [file.name for file in worker_files(tmp_path / "cassette.jsonl")] == ["cassette.gw2.jsonl", "cassette.gw10.jsonl"]
+    assert [file.name for file in worker_files(tmp_path / "cassette.mt5.jsonl")] == ["cassette.mt5.gw0.jsonl"]
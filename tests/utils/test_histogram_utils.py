@@ -0,0 +1,67 @@
+import pytest
+
+from src.utils.histogram_utils import LatencyHistogram, LatencyRecorder, normalize_path
+
+
+def _histogram(values, precision=0.01):
+    histogram = LatencyHistogram(precision)
+    for value in values:
+        histogram.record(value)
+    return histogram
+
+
+def test_percentiles_within_precision():
+    histogram = _histogram([ms / 1000 for ms in range(1, 1001)])
+
+    for pct, expected in ((50, 0.5), (95, 0.95), (99, 0.99)):
+        assert histogram.percentile(pct) == pytest.approx(expected, rel=histogram.precision)
+    assert histogram.percentile(100) == histogram.max == 1.0
+    assert histogram.count == 1000
+    assert histogram.mean == pytest.approx(0.5005)
+
+
+def test_zeros_and_empty_histogram():
+    assert LatencyHistogram().percentile(99) == 0.0
+
+    histogram = _histogram([0, 0, 0, 0.2])
+    assert histogram.percentile(75) == 0.0
+    assert histogram.percentile(100) == 0.2
+    assert histogram.count_above(0) == 1
+
+
+def test_merge_matches_recording_everything_at_once():
+    values = [ms / 1000 for ms in range(0, 2000, 7)]
+    merged = _histogram(values[::2]).merge(_histogram(values[1::2]))
+    expected = _histogram(values)
+
+    assert (merged.buckets, merged.zeros, merged.count, merged.max) == (expected.buckets, expected.zeros, expected.count, expected.max)
+    assert merged.total == pytest.approx(expected.total)
+    assert [merged.percentile(pct) for pct in (50, 95, 99)] == [expected.percentile(pct) for pct in (50, 95, 99)]
+
+
+def test_merge_rejects_other_precision():
+    with pytest.raises(ValueError):
+        LatencyHistogram(0.01).merge(LatencyHistogram(0.05))
+
+
+def test_recorder_merges_worker_histograms():
+    recorder, worker = LatencyRecorder(), LatencyRecorder()
+    recorder.record("get", "/api/order/v1/1", 0.1)
+    worker.record("GET", "/api/order/v1/2", 0.3)
+    worker.record("POST", "/api/trade/v1/order", 0.2)
+
+    recorder.merge({key: LatencyHistogram.from_dict(histogram.to_dict()) for key, histogram in worker.histograms.items()})
+    assert {row["endpoint"]: row["count"] for row in recorder.summary()} == {"GET /api/order/v1/{id}": 2, "POST /api/trade/v1/order": 1}
+    assert recorder.histograms["GET /api/order/v1/{id}"].max == 0.3
+
+
+def test_round_trip_through_dict():
+    histogram = _histogram([0, 0.003, 0.04, 0.5])
+    restored = LatencyHistogram.from_dict(histogram.to_dict())
+    assert restored.to_dict() == histogram.to_dict()
+    assert restored.percentile(50) == histogram.percentile(50)
+
+
+def test_normalize_path():
+    assert normalize_path("/api/order/v1/123?symbol=X") == "/api/order/v1/{id}"
+    assert normalize_path("/api/user/6f1c2a3b4d5e6f7a8b9c0d1e/info") == "/api/user/{id}/info"
@@ -0,0 +1,45 @@
+import asyncio
+import threading
+
+from src.utils import load_utils
+from src.utils.load_utils import LoadStats, run_virtual_users
+
+
+def test_throughput_over_the_time_each_endpoint_was_under_load():
+    stats = LoadStats()
+    stats.start()
+    for _ in range(10):
+        stats.record("GET", "http://host/api/pending", 200)
+    stats.stop(1.0)
+    stats.start()
+    for _ in range(30):
+        stats.record("POST", "http://host/api/order", 200)
+    stats.stop(3.0)
+
+    assert stats.elapsed == 4.0
+    assert [(row["endpoint"], row["throughput"]) for row in stats.report()] == [
+        ("GET /api/pending", 10.0), ("POST /api/order", 10.0),
+    ]
+
+
+def test_every_virtual_user_runs_its_own_event_loop(monkeypatch):
+    monkeypatch.setattr(load_utils, "load_stats", LoadStats())
+    shared = asyncio.new_event_loop()
+    loops = {}
+
+    def iteration(async_loop, value):
+        assert async_loop is not shared and value == 1
+        loops.setdefault(threading.get_ident(), async_loop)
+        assert loops[threading.get_ident()] is async_loop
+        async_loop.run_until_complete(asyncio.sleep(0.001))
+
+    try:
+        error = run_virtual_users(
+            iteration, dict(async_loop=shared, value=1), authenticate=lambda account: {}, users=3, duration=0.2,
+        )
+    finally:
+        shared.close()
+
+    assert error is None
+    assert len(set(map(id, loops.values()))) == 3
+    assert all(loop.is_closed() for loop in loops.values())
@@ -0,0 +1,43 @@
+import pytest
+
+from src.utils.pagination_utils import PageIterator
+
+
+class _Pages:
+    """Fake list endpoint serving `total` rows."""
+
+    def __init__(self, total):
+        self.total = total
+
+    def __call__(self, params, **kwargs):
+        start = (params["page"] - 1) * params["size"]
+        return _Body(dict(result=list(range(start, min(start + params["size"], self.total)))))
+
+
+class _Body:
+    def __init__(self, body):
+        self.body = body
+
+    def json(self):
+        return self.body
+
+
+@pytest.mark.parametrize("prefetch", [0, 1, 2])
+def test_at_most_prefetch_plus_one_pages_are_held(prefetch, monkeypatch):
+    iterator = PageIterator(_Pages(total=45), page_size=10, prefetch=prefetch)
+    fetch, ahead = iterator._fetch, []
+
+    def recording_fetch(page):
+        if iterator.pages:  # a page is being read (or was just released), count the pages requested past it
+            ahead.append(page - iterator.pages)
+        return fetch(page)
+
+    monkeypatch.setattr(iterator, "_fetch", recording_fetch)
+    assert list(iterator) == list(range(45))
+    assert (iterator.pages, iterator.rows) == (5, 45)
+    assert max(ahead) == max(prefetch, 1)
+
+
+def test_iteration_stops_at_short_page_and_max_pages():
+    assert list(PageIterator(_Pages(total=25), page_size=10)) == list(range(25))
+    assert len(list(PageIterator(_Pages(total=50), page_size=10, max_pages=2))) == 20
@@ -0,0 +1,56 @@
+import pytest
+
+from src.utils.histogram_utils import LatencyHistogram
+from src.utils.perf_baseline import PerfBaseline, sign_test_pvalue, OK, REGRESSION, NEW, FEW_SAMPLES
+
+ENDPOINT = "GET /api/order/v1/pending"
+
+
+def _histogram(values):
+    histogram = LatencyHistogram()
+    for value in values:
+        histogram.record(value)
+    return histogram
+
+
+@pytest.fixture
+def baseline(tmp_path):
+    baseline = PerfBaseline(path=tmp_path / "baseline.json", min_samples=10)
+    baseline.lock_path = tmp_path / "baseline.json.lock"
+    baseline.update({ENDPOINT: _histogram([0.1] * 50)}, "dev", "lirunex", "mt5")
+    return baseline
+
+
+def _verdict(baseline, values, endpoint=ENDPOINT):
+    (row,) = baseline.compare({endpoint: _histogram(values)}, "dev", "lirunex", "mt5")
+    return row["verdict"]
+
+
+def test_sign_test_pvalue():
+    assert sign_test_pvalue(0, 10) == 1.0
+    assert sign_test_pvalue(10, 10) == pytest.approx(0.5 ** 10)
+    assert sign_test_pvalue(5, 10) == pytest.approx(638 / 1024)
+
+
+def test_compare_verdicts(baseline):
+    assert _verdict(baseline, [0.1] * 30) == OK
+    assert _verdict(baseline, [0.1] * 27 + [2.0] * 3) == OK  # a few slow outliers
+    assert _verdict(baseline, [0.2] * 30) == REGRESSION
+    assert _verdict(baseline, [0.2] * 5) == FEW_SAMPLES
+    assert _verdict(baseline, [0.1] * 30, endpoint="GET /api/order/v1/history") == NEW
+
+
+def test_compare_is_keyed_by_combination(baseline):
+    (row,) = baseline.compare({ENDPOINT: _histogram([0.2] * 30)}, "dev", "lirunex", "mt4")
+    assert row["verdict"] == NEW
+
+
+def test_update_skips_few_samples_and_bounds_history(tmp_path):
+    baseline = PerfBaseline(path=tmp_path / "baseline.json", min_samples=10, history=3)
+    baseline.lock_path = tmp_path / "baseline.json.lock"
+    for _ in range(5):
+        baseline.update({ENDPOINT: _histogram([0.1] * 10), "GET /few": _histogram([0.1] * 9)}, "dev", "lirunex", "mt5")
+
+    stored = baseline.load()
+    assert list(stored) == [PerfBaseline.key("dev", "lirunex", "mt5", ENDPOINT)]
+    assert len(stored[PerfBaseline.key("dev", "lirunex", "mt5", ENDPOINT)]["history"]) == 3
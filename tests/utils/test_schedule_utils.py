@@ -0,0 +1,53 @@
+from collections import defaultdict
+
+from src.utils.schedule_utils import lpt_order, lpt_tree_order, lpt_assign
+
+
+def _loads(costs, assignment, workers):
+    loads = defaultdict(float)
+    for unit, worker in assignment.items():
+        loads[worker] += costs[unit]
+    return [loads[worker] for worker in range(workers)]
+
+
+def test_lpt_order_is_longest_first_with_stable_ties():
+    assert lpt_order(dict(b=1, a=1, c=5, d=3)) == ["c", "d", "a", "b"]
+
+
+def test_lpt_tree_order_keeps_packages_together():
+    costs = {
+        "tests/trade/market/test_bulk.py": 9, "tests/auth/test_login.py": 5, "tests/trade/order/test_order.py": 1,
+        "tests/trade/pending/test_pending.py": 2, "tests/test_health.py": 4,
+    }
+    assert lpt_tree_order(costs) == [
+        "tests/trade/market/test_bulk.py", "tests/trade/pending/test_pending.py", "tests/trade/order/test_order.py",
+        "tests/auth/test_login.py", "tests/test_health.py",
+    ]
+
+
+def test_lpt_tree_order_keeps_modules_together():
+    costs = {"tests/a/test_x.py::test_1": 1, "tests/a/test_y.py::test_1": 3, "tests/a/test_x.py::test_2": 2.5}
+    assert lpt_tree_order(costs) == ["tests/a/test_x.py::test_2", "tests/a/test_x.py::test_1", "tests/a/test_y.py::test_1"]
+
+
+def test_lpt_assign_balances_workers():
+    costs = dict(a=7, b=5, c=4, d=3, e=1)
+    assignment = lpt_assign(costs, 2)
+    assert assignment == dict(a=0, b=1, c=1, d=0, e=1)
+    assert _loads(costs, assignment, 2) == [10, 10]
+
+
+def test_lpt_assign_puts_long_unit_alone():
+    costs = dict(long=10) | {f"short_{i}": 2 for i in range(5)}
+    assignment = lpt_assign(costs, 2)
+    assert [unit for unit, worker in assignment.items() if worker == assignment["long"]] == ["long"]
+    assert _loads(costs, assignment, 2) == [10, 10]
+
+
+def test_lpt_assign_within_bound_of_optimum():
+    costs = {f"unit_{i}": (i * 37) % 23 + 1 for i in range(40)}  # fixed pseudo-random durations
+    for workers in (2, 3, 4, 8):
+        loads = _loads(costs, lpt_assign(costs, workers), workers)
+        # LPT makespan is at most 4/3 of the optimum, which is at least the average load
+        assert max(loads) <= 4 / 3 * max(sum(costs.values()) / workers, max(costs.values()))
+        assert len(lpt_assign(costs, workers)) == len(costs)
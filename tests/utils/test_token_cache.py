@@ -0,0 +1,60 @@
+import asyncio
+import base64
+import json
+import time
+
+import pytest
+
+from src.utils.token_cache import TokenCache, decode_token_expiry
+
+
+def _token(exp):
+    claims = base64.urlsafe_b64encode(json.dumps(dict(exp=exp)).encode()).decode().rstrip("=")
+    return f"header.{claims}.signature"
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return TokenCache(tmp_path / "tokens.json")
+
+
+def test_decode_token_expiry():
+    assert decode_token_expiry(_token(1700000000)) == 1700000000
+    assert decode_token_expiry("opaque") is None
+
+
+def test_expiring_token_is_refreshed(cache):
+    cache.put("key", _token(time.time() + 30))  # within refresh_before
+    assert cache.get("key") is None
+    assert cache.get_or_login("key", lambda: _token(time.time() + 3600)) == cache.get("key")
+
+
+def test_concurrent_async_logins_log_in_once(cache):
+    logins = []
+
+    async def login():
+        logins.append(1)
+        await asyncio.sleep(0.05)
+        return _token(time.time() + 3600)
+
+    async def main():
+        return await asyncio.gather(*(cache.get_or_login_async("key", login) for _ in range(10)))
+
+    tokens = asyncio.run(main())
+    assert len(logins) == 1 and len(set(tokens)) == 1
+    assert TokenCache(cache.path).get("key") == tokens[0]  # shared through the file
+
+
+def test_sync_login_on_the_loop_thread_waits_for_the_async_one(cache):
+    async def login():
+        await asyncio.sleep(0.1)
+        return _token(time.time() + 3600)
+
+    async def main():
+        task = asyncio.create_task(cache.get_or_login_async("key", login))
+        await asyncio.sleep(0.02)  # the async login holds the cache lock
+        token = cache.get_or_login("key", lambda: pytest.fail("logged in twice"))  # blocks the loop thread
+        return token, await task
+
+    token, async_token = asyncio.run(main())
+    assert token == async_token